@@ -4,15 +4,85 @@ CPU-optimized audio preprocessing and postprocessing
 """
 
 import numpy as np
+import scipy.fft as sfft
 import soundfile as sf
-import librosa
 import asyncio
+import contextlib
 import logging
-from typing import Tuple, Optional
+import math
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Tuple, Optional, List, Dict
 from pathlib import Path
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import signal
+
+try:
+    import soxr
+except ImportError:
+    soxr = None
+
+try:
+    import numpy_rms
+except ImportError:
+    numpy_rms = None
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback no-op decorator when numba is not installed"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 logger = logging.getLogger(__name__)
 
+# Pin the pocketfft backend once so scipy.fft calls skip backend resolution
+sfft.set_global_backend('scipy')
+
+
+@njit(cache=True, fastmath=True)
+def _envelope_follow(env_out, envelope, attack_coeff, release_coeff):
+    """Attack/release envelope follower, env_out[0] must be seeded by the caller"""
+    for i in range(1, envelope.shape[0]):
+        prev = env_out[i - 1]
+        if envelope[i] > prev:
+            # Attack
+            env_out[i] = attack_coeff * prev + (1.0 - attack_coeff) * envelope[i]
+        else:
+            # Release
+            env_out[i] = release_coeff * prev + (1.0 - release_coeff) * envelope[i]
+
+
+@njit(cache=True, fastmath=True)
+def _overlap_add(frames, window, hop_length, out, window_sum):
+    """Windowed overlap-add of time-domain frames into out, accumulating window**2"""
+    n_fft = frames.shape[1]
+    for t in range(frames.shape[0]):
+        start = t * hop_length
+        for k in range(n_fft):
+            out[start + k] += frames[t, k] * window[k]
+            window_sum[start + k] += window[k] * window[k]
+
+
+# Warm the JIT once at import so the first request doesn't pay compilation
+_envelope_follow(np.zeros(2, dtype=np.float32), np.ones(2, dtype=np.float32), 0.5, 0.5)
+_overlap_add(
+    np.zeros((1, 2), dtype=np.float32), np.ones(2, dtype=np.float32), 1,
+    np.zeros(2, dtype=np.float32), np.zeros(2, dtype=np.float32)
+)
+
+
 class AudioProcessor:
     """CPU-optimized audio processing utilities"""
     
@@ -22,6 +92,30 @@ class AudioProcessor:
         self.win_length = 1024
         self.n_fft = 1024
         
+        # Inputs with more decoded samples than this (all channels) are streamed
+        # from disk in blocks instead of being read in one piece
+        self.stream_threshold_samples = 1 << 24
+        self.stream_blocksize = 1 << 20
+        
+        # Bounded pool for file reads/writes so concurrent requests don't pile
+        # onto the shared default executor
+        self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="audio_io")
+        
+        # Process pool for batch DSP, created on first use
+        self.use_process_pool = True
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+        
+        # Periodic Hann analysis/synthesis window, built once in float32
+        self._stft_window = signal.get_window('hann', self.n_fft).astype(np.float32)
+        
+        # High-pass filter designs (second-order sections) keyed by sample rate
+        self._highpass_sos: Dict[int, Optional[np.ndarray]] = {}
+        self._get_highpass_sos(sample_rate)
+        
+        # Compressor smoothing coefficients for the default attack/release times
+        self._attack_coeff_default = self._smoothing_coeff(0.003)
+        self._release_coeff_default = self._smoothing_coeff(0.1)
+        
     async def preprocess(
         self,
         input_path: str,
@@ -44,49 +138,190 @@ class AudioProcessor:
         try:
             logger.info(f"Preprocessing audio: {input_path}")
             
-            if target_sr is None:
-                target_sr = self.sample_rate
-            
             # Load audio file
-            audio, sr = await self._load_audio_async(input_path)
-            
-            # Resample if necessary
-            if sr != target_sr:
-                audio = librosa.resample(audio, orig_sr=sr, target_sr=target_sr)
-                sr = target_sr
-            
-            # Convert to mono if stereo
-            if len(audio.shape) > 1:
-                audio = librosa.to_mono(audio)
-            
-            # Apply noise reduction
-            if noise_reduction > 0:
-                audio = await self._reduce_noise(audio, sr, strength=noise_reduction)
-            
-            # Normalize audio
-            if normalize:
-                audio = self._normalize_audio(audio)
-            
-            # Trim silence
-            audio = self._trim_silence(audio, sr)
+            audio, sr = await self._load_audio_async(input_path, target_sr)
             
-            logger.info(f"Audio preprocessed: {len(audio)} samples at {sr}Hz")
-            return audio
+            return await self._preprocess_loaded(audio, sr, target_sr, normalize, noise_reduction)
             
         except Exception as e:
             logger.error(f"Audio preprocessing failed: {e}")
             raise
     
-    async def _load_audio_async(self, file_path: str) -> Tuple[np.ndarray, int]:
-        """Load audio file asynchronously"""
-        def load_audio():
-            return sf.read(file_path)
+    async def preprocess_batch(
+        self,
+        input_paths: List[str],
+        target_sr: Optional[int] = None,
+        normalize: bool = True,
+        noise_reduction: float = 0.3,
+        max_prefetch: int = 2
+    ) -> List[np.ndarray]:
+        """
+        Preprocess several audio files, in parallel worker processes when the
+        process pool is enabled, else decoding upcoming files in background
+        threads while the current one is being processed
+        
+        Args:
+            input_paths: Paths to input audio files
+            target_sr: Target sample rate (defaults to self.sample_rate)
+            normalize: Whether to normalize audio
+            noise_reduction: Noise reduction strength (0.0 to 1.0)
+            max_prefetch: Maximum number of decoded files held in memory
+            
+        Returns:
+            Preprocessed audio data, in the same order as input_paths
+        """
+        if len(input_paths) > 1 and self.use_process_pool:
+            # Decode and process each file in its own worker process, sidestepping the GIL
+            loop = asyncio.get_running_loop()
+            cpu_pool = self._get_cpu_pool()
+            return list(await asyncio.gather(*[
+                loop.run_in_executor(
+                    cpu_pool, _preprocess_in_worker, self.sample_rate,
+                    path, target_sr, normalize, noise_reduction
+                )
+                for path in input_paths
+            ]))
+        
+        # Each slot is held from the start of a load until that file is processed
+        slots = asyncio.Semaphore(max_prefetch)
+        
+        async def load(index: int, path: str):
+            await slots.acquire()
+            try:
+                return index, await self._load_audio_async(path, target_sr)
+            except BaseException:
+                slots.release()
+                raise
+        
+        results: List[Optional[np.ndarray]] = [None] * len(input_paths)
+        loads = [load(i, path) for i, path in enumerate(input_paths)]
+        
+        for next_loaded in asyncio.as_completed(loads):
+            index, (audio, sr) = await next_loaded
+            try:
+                logger.info(f"Preprocessing audio: {input_paths[index]}")
+                results[index] = await self._preprocess_loaded(
+                    audio, sr, target_sr, normalize, noise_reduction
+                )
+            finally:
+                slots.release()
+        
+        return results
+    
+    async def _preprocess_loaded(
+        self,
+        audio: np.ndarray,
+        sr: int,
+        target_sr: Optional[int],
+        normalize: bool,
+        noise_reduction: float
+    ) -> np.ndarray:
+        """Run the preprocessing chain on already-decoded audio"""
+        if target_sr is None:
+            target_sr = self.sample_rate
+        
+        # Convert to mono if stereo (soundfile returns frames x channels);
+        # done before resampling so only one channel goes through the filter
+        if len(audio.shape) > 1:
+            audio = np.mean(audio, axis=1, dtype=np.float32)
+        
+        # Resample if necessary
+        if sr != target_sr:
+            audio = self._resample(audio, sr, target_sr)
+            sr = target_sr
+        
+        # Apply noise reduction
+        if noise_reduction > 0:
+            audio = await self._reduce_noise(audio, sr, strength=noise_reduction)
+        
+        # One energy scan serves both normalization and trimming; a uniform
+        # gain doesn't move the trim points since they are relative to the peak
+        frame_energy, total_energy = self._framed_energy(audio)
+        
+        # Normalize audio
+        if normalize:
+            rms = float(np.sqrt(total_energy / audio.size)) if audio.size else 0.0
+            audio = self._normalize_audio(audio, rms=rms)
+        
+        # Trim silence
+        audio = self._trim_silence(audio, sr, frame_energy=frame_energy)
+        
+        logger.info(f"Audio preprocessed: {len(audio)} samples at {sr}Hz")
+        return audio
+    
+    async def _load_audio_async(
+        self,
+        file_path: str,
+        target_sr: Optional[int] = None
+    ) -> Tuple[np.ndarray, int]:
+        """Load audio file asynchronously as float32"""
+        # Run in the I/O pool to avoid blocking
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_pool, self._read_audio, file_path, target_sr)
+    
+    def _read_audio(self, file_path: str, target_sr: Optional[int] = None) -> Tuple[np.ndarray, int]:
+        """Decode an audio file, streaming very long inputs to cap peak memory"""
+        info = sf.info(file_path)
+        
+        if info.frames * info.channels <= self.stream_threshold_samples:
+            # Decode straight to float32
+            return sf.read(file_path, dtype='float32', always_2d=False)
+        
+        return self._read_audio_streaming(file_path, info, target_sr or self.sample_rate)
+    
+    def _read_audio_streaming(self, file_path: str, info, target_sr: int) -> Tuple[np.ndarray, int]:
+        """
+        Decode a long file block by block, mixing down to mono and (with soxr)
+        resampling each block, so the multichannel source is never fully resident
+        
+        Returns:
+            Mono float32 audio and its sample rate (target_sr if resampled here)
+        """
+        logger.info(f"Streaming long input ({info.frames} frames x {info.channels} ch): {file_path}")
+        
+        resampler = None
+        if info.samplerate != target_sr and soxr is not None:
+            resampler = soxr.ResampleStream(info.samplerate, target_sr, 1, dtype='float32', quality='HQ')
+        
+        chunks = []
+        for block in sf.blocks(file_path, blocksize=self.stream_blocksize, dtype='float32', always_2d=True):
+            mono = np.mean(block, axis=1, dtype=np.float32) if block.shape[1] > 1 else block[:, 0]
+            if resampler is not None:
+                mono = resampler.resample_chunk(np.ascontiguousarray(mono))
+            chunks.append(mono)
+        
+        if resampler is None:
+            return np.concatenate(chunks), info.samplerate
+        
+        chunks.append(resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True))
+        return np.concatenate(chunks), target_sr
+    
+    def _get_cpu_pool(self) -> ProcessPoolExecutor:
+        """Get the batch DSP process pool, creating it on first use"""
+        if self._cpu_pool is None:
+            self._cpu_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=mp.get_context('spawn')
+            )
+        return self._cpu_pool
+    
+    def shutdown(self):
+        """Shut down the I/O thread pool and batch process pool"""
+        self._io_pool.shutdown(wait=True)
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=True)
+            self._cpu_pool = None
+    
+    def _resample(self, audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+        """Resample with soxr when available, else scipy polyphase filtering"""
+        audio = np.asarray(audio, dtype=np.float32)
         
-        # Run in thread to avoid blocking
-        loop = asyncio.get_event_loop()
-        audio, sr = await loop.run_in_executor(None, load_audio)
+        if soxr is not None:
+            return soxr.resample(audio, orig_sr, target_sr, quality='HQ')
         
-        return audio.astype(np.float32), sr
+        g = math.gcd(orig_sr, target_sr)
+        resampled = signal.resample_poly(audio, up=target_sr // g, down=orig_sr // g)
+        return resampled.astype(np.float32, copy=False)
     
     async def _reduce_noise(
         self, 
@@ -98,48 +333,87 @@ class AudioProcessor:
         try:
             # Simple spectral subtraction for noise reduction
             # This is a basic implementation - replace with more sophisticated methods
-            
-            # Compute STFT
-            stft = librosa.stft(audio, n_fft=self.n_fft, hop_length=self.hop_length)
-            magnitude = np.abs(stft)
-            phase = np.angle(stft)
-            
-            # Estimate noise floor from first few frames
-            noise_frames = min(10, magnitude.shape[1] // 10)
-            noise_floor = np.mean(magnitude[:, :noise_frames], axis=1, keepdims=True)
-            
-            # Apply spectral subtraction
-            alpha = strength * 2  # Noise reduction factor
-            enhanced_magnitude = magnitude - alpha * noise_floor
-            
-            # Ensure non-negative values
-            enhanced_magnitude = np.maximum(enhanced_magnitude, 0.1 * magnitude)
-            
-            # Reconstruct audio
-            enhanced_stft = enhanced_magnitude * np.exp(1j * phase)
-            enhanced_audio = librosa.istft(
-                enhanced_stft, 
-                hop_length=self.hop_length, 
-                length=len(audio)
-            )
-            
-            return enhanced_audio.astype(np.float32)
+            return self._reduce_noise_blocked(audio, sr, strength=strength)
             
         except Exception as e:
             logger.warning(f"Noise reduction failed, using original audio: {e}")
             return audio
     
-    def _normalize_audio(self, audio: np.ndarray, target_db: float = -20.0) -> np.ndarray:
+    def _reduce_noise_blocked(
+        self,
+        audio: np.ndarray,
+        sr: int,
+        strength: float = 0.3,
+        block_frames: int = 512
+    ) -> np.ndarray:
+        """Spectral subtraction processed in blocks of STFT frames to bound peak memory"""
+        audio = np.asarray(audio, dtype=np.float32)
+        window = self._stft_window
+        pad = self.n_fft // 2
+        
+        # Strided (n_frames, n_fft) view of the centered signal - no copy
+        padded = np.pad(audio, pad)
+        frame_view = sliding_window_view(padded, self.n_fft)[::self.hop_length]
+        n_frames = frame_view.shape[0]
+        
+        # Estimate noise floor from first few frames only
+        noise_frames = max(1, min(10, n_frames // 10))
+        noise_spec = sfft.rfft(frame_view[:noise_frames] * window, axis=-1, workers=-1)
+        noise_floor = np.mean(np.abs(noise_spec), axis=0)
+        
+        alpha = strength * 2  # Noise reduction factor
+        noise_estimate = alpha * noise_floor
+        
+        output = np.zeros(len(padded), dtype=np.float32)
+        window_sum = np.zeros(len(padded), dtype=np.float32)
+        frames = np.empty((block_frames, self.n_fft), dtype=np.float32)
+        
+        for start in range(0, n_frames, block_frames):
+            count = min(block_frames, n_frames - start)
+            block = frames[:count]
+            np.multiply(frame_view[start:start + count], window, out=block)
+            
+            spec = sfft.rfft(block, axis=-1, workers=-1)
+            magnitude = np.abs(spec)
+            
+            # Apply spectral subtraction, keeping at least 10% of each bin
+            enhanced_magnitude = np.maximum(magnitude - noise_estimate, 0.1 * magnitude)
+            
+            # Rescale the complex bins in place by enhanced/original magnitude:
+            # spec/|spec| is the phase term, so no angle()/exp() is needed
+            np.maximum(magnitude, 1e-8, out=magnitude)
+            np.divide(enhanced_magnitude, magnitude, out=enhanced_magnitude)
+            np.multiply(spec, enhanced_magnitude, out=spec)
+            
+            enhanced_frames = sfft.irfft(spec, n=self.n_fft, axis=-1, workers=-1)
+            offset = start * self.hop_length
+            _overlap_add(
+                enhanced_frames, window, self.hop_length,
+                output[offset:], window_sum[offset:]
+            )
+        
+        nonzero = window_sum > 1e-8
+        output[nonzero] /= window_sum[nonzero]
+        
+        return output[pad:pad + len(audio)]
+    
+    def _normalize_audio(
+        self,
+        audio: np.ndarray,
+        target_db: float = -20.0,
+        rms: Optional[float] = None
+    ) -> np.ndarray:
         """Normalize audio to target RMS level"""
-        # Calculate current RMS
-        rms = np.sqrt(np.mean(audio**2))
+        # Calculate current RMS unless the caller already has it
+        if rms is None:
+            rms = self._rms(audio)
         
         if rms > 0:
             # Convert target dB to linear scale
             target_rms = 10**(target_db / 20.0)
             
-            # Apply gain
-            gain = target_rms / rms
+            # Apply gain (as float32 so the multiply doesn't promote)
+            gain = np.float32(target_rms / rms)
             normalized_audio = audio * gain
             
             # Prevent clipping
@@ -151,21 +425,68 @@ class AudioProcessor:
         
         return audio
     
+    def _rms(self, audio: np.ndarray) -> float:
+        """Root-mean-square level computed without an audio**2 temporary"""
+        if audio.size == 0:
+            return 0.0
+        
+        if numpy_rms is not None:
+            return float(numpy_rms.rms(audio)[0])
+        
+        # einsum fuses square + accumulate into a single pass
+        return float(np.sqrt(np.einsum('i,i->', audio, audio) / audio.size))
+    
+    def _framed_energy(
+        self,
+        audio: np.ndarray,
+        frame_length: int = 2048,
+        hop_length: int = 512
+    ) -> Tuple[np.ndarray, float]:
+        """
+        Sum of squares per centered frame, computed in one pass via a running sum
+        
+        Returns:
+            Per-frame energy and the total energy of the signal
+        """
+        pad = frame_length // 2
+        
+        # Running sum of squares in float64 so frame differences stay accurate
+        cumulative = np.zeros(len(audio) + 2 * pad + 1, dtype=np.float64)
+        np.square(audio, out=cumulative[pad + 1:pad + 1 + len(audio)], dtype=np.float64)
+        np.cumsum(cumulative, out=cumulative)
+        
+        n_frames = 1 + (len(cumulative) - 1 - frame_length) // hop_length
+        starts = np.arange(n_frames) * hop_length
+        frame_energy = cumulative[starts + frame_length] - cumulative[starts]
+        
+        return frame_energy, float(cumulative[-1])
+    
     def _trim_silence(
         self, 
         audio: np.ndarray, 
         sr: int, 
-        threshold_db: float = -40.0
+        threshold_db: float = -40.0,
+        frame_energy: Optional[np.ndarray] = None
     ) -> np.ndarray:
         """Trim silence from beginning and end of audio"""
         try:
-            # Use librosa to trim silence
-            trimmed_audio, _ = librosa.effects.trim(
-                audio, 
-                top_db=-threshold_db,
-                frame_length=2048,
-                hop_length=512
-            )
+            frame_length = 2048
+            hop_length = 512
+            
+            if frame_energy is None:
+                frame_energy, _ = self._framed_energy(audio, frame_length, hop_length)
+            
+            # Frame level in dB relative to the loudest frame (as librosa.effects.trim)
+            mse = np.maximum(frame_energy / frame_length, 1e-10)
+            reference = max(float(np.max(mse)), 1e-10)
+            non_silent = np.flatnonzero(10 * np.log10(mse / reference) > threshold_db)
+            
+            if len(non_silent) == 0:
+                trimmed_audio = audio[:0]
+            else:
+                start = non_silent[0] * hop_length
+                end = min(len(audio), (non_silent[-1] + 1) * hop_length)
+                trimmed_audio = audio[start:end]
             
             # Ensure minimum length
             min_length = int(0.1 * sr)  # 100ms minimum
@@ -195,12 +516,13 @@ class AudioProcessor:
             apply_compressor: Whether to apply dynamic range compression
             
         Returns:
-            Postprocessed audio data
+            Postprocessed audio data (the input array is never modified)
         """
         try:
             logger.info("Postprocessing converted audio")
             
-            processed_audio = audio.copy()
+            # No defensive copy: every stage below writes to a new buffer
+            processed_audio = np.asarray(audio, dtype=np.float32)
             
             # Apply quality enhancement
             if enhance_quality:
@@ -210,11 +532,10 @@ class AudioProcessor:
             if apply_compressor:
                 processed_audio = self._apply_compressor(processed_audio)
             
-            # Final normalization
-            processed_audio = self._normalize_audio(processed_audio, target_db=-16.0)
-            
-            # Apply soft limiting to prevent clipping
-            processed_audio = self._soft_limit(processed_audio)
+            # Final normalization and soft limiting in a single write pass, in
+            # place once an earlier stage has produced a buffer we own
+            scratch = processed_audio if processed_audio is not audio else None
+            processed_audio = self._finalize(processed_audio, target_db=-16.0, out=scratch)
             
             return processed_audio
             
@@ -241,11 +562,20 @@ class AudioProcessor:
         """Enhance harmonic content"""
         # Simple harmonic enhancement using second-order harmonics
         try:
-            # Generate harmonics
-            harmonics = np.sign(audio) * (audio**2)
+            # 0.85 * x + 0.15 * sign(x) * x**2, using sign(x) * x**2 == x * |x|
+            dry = np.float32(0.85)
+            wet = np.float32(0.15)
+            
+            if numexpr is not None:
+                return numexpr.evaluate(
+                    "dry * audio + wet * audio * abs(audio)",
+                    local_dict={"audio": audio, "dry": dry, "wet": wet}
+                )
             
-            # Mix with original audio
-            enhanced_audio = 0.85 * audio + 0.15 * harmonics
+            enhanced_audio = np.abs(audio)
+            np.multiply(enhanced_audio, audio, out=enhanced_audio)
+            np.multiply(enhanced_audio, wet, out=enhanced_audio)
+            enhanced_audio += dry * audio
             
             return enhanced_audio
             
@@ -257,30 +587,17 @@ class AudioProcessor:
         """Apply subtle high-frequency enhancement"""
         try:
             # Apply high-shelf filter
-            from scipy import signal
-            
-            # Design high-shelf filter
-            freq = 4000  # 4kHz
             gain_db = 2.0  # 2dB boost
             
-            # Convert to normalized frequency
-            nyquist = sr / 2
-            normalized_freq = freq / nyquist
-            
-            if normalized_freq < 1.0:
-                # Design filter
-                b, a = signal.iirfilter(
-                    2, normalized_freq, 
-                    btype='highpass', 
-                    ftype='butter'
-                )
-                
-                # Apply filter with gain
-                filtered = signal.filtfilt(b, a, audio)
+            sos = self._get_highpass_sos(sr)
+            if sos is not None:
+                # Single causal pass; a 2 dB shelf doesn't need zero-phase filtering
+                filtered = signal.sosfilt(sos, audio)
                 gain_linear = 10**(gain_db / 20.0)
                 
-                # Mix with original
-                enhanced_audio = audio + 0.1 * (gain_linear - 1) * filtered
+                # Mix with original, reusing the filter output buffer
+                enhanced_audio = np.multiply(filtered, np.float32(0.1 * (gain_linear - 1)), out=filtered)
+                enhanced_audio += audio
                 
                 return enhanced_audio
             
@@ -289,56 +606,60 @@ class AudioProcessor:
         
         return audio
     
+    def _get_highpass_sos(self, sr: int, freq: float = 4000.0) -> Optional[np.ndarray]:
+        """Get the cached 4kHz Butterworth high-pass design for a sample rate"""
+        if sr not in self._highpass_sos:
+            # Convert to normalized frequency
+            normalized_freq = freq / (sr / 2)
+            
+            if normalized_freq < 1.0:
+                sos = signal.butter(2, normalized_freq, btype='highpass', output='sos')
+                self._highpass_sos[sr] = sos.astype(np.float32)
+            else:
+                self._highpass_sos[sr] = None
+        
+        return self._highpass_sos[sr]
+    
     def _apply_compressor(
         self, 
         audio: np.ndarray, 
         threshold: float = -12.0,
         ratio: float = 4.0,
-        attack_time: float = 0.003,
-        release_time: float = 0.1
+        attack_time: Optional[float] = None,
+        release_time: Optional[float] = None
     ) -> np.ndarray:
-        """Apply dynamic range compression"""
+        """Apply dynamic range compression (default attack 3ms, release 100ms)"""
         try:
             # Simple feed-forward compressor
-            threshold_linear = 10**(threshold / 20.0)
+            threshold_linear = np.float32(10**(threshold / 20.0))
             
             # Calculate envelope
             envelope = np.abs(audio)
             
             # Smooth envelope (attack/release)
-            sr = self.sample_rate
-            attack_coeff = np.exp(-1.0 / (attack_time * sr))
-            release_coeff = np.exp(-1.0 / (release_time * sr))
-            
-            smoothed_envelope = np.zeros_like(envelope)
-            for i in range(1, len(envelope)):
-                if envelope[i] > smoothed_envelope[i-1]:
-                    # Attack
-                    smoothed_envelope[i] = (
-                        attack_coeff * smoothed_envelope[i-1] + 
-                        (1 - attack_coeff) * envelope[i]
-                    )
-                else:
-                    # Release
-                    smoothed_envelope[i] = (
-                        release_coeff * smoothed_envelope[i-1] + 
-                        (1 - release_coeff) * envelope[i]
-                    )
-            
-            # Calculate gain reduction
-            gain_reduction = np.ones_like(smoothed_envelope)
-            above_threshold = smoothed_envelope > threshold_linear
-            
-            if np.any(above_threshold):
-                # Apply compression to signals above threshold
-                compressed_level = (
-                    threshold_linear * 
-                    (smoothed_envelope[above_threshold] / threshold_linear)**(1/ratio)
-                )
-                gain_reduction[above_threshold] = compressed_level / smoothed_envelope[above_threshold]
+            attack_coeff = (
+                self._attack_coeff_default if attack_time is None
+                else self._smoothing_coeff(attack_time)
+            )
+            release_coeff = (
+                self._release_coeff_default if release_time is None
+                else self._smoothing_coeff(release_time)
+            )
+            
+            smoothed_envelope = np.empty_like(envelope)
+            smoothed_envelope[0] = envelope[0]
+            _envelope_follow(smoothed_envelope, envelope, attack_coeff, release_coeff)
+            
+            # Calculate gain reduction: threshold * (env/threshold)**(1/ratio) / env
+            # == (env/threshold)**(1/ratio - 1). Clamping env to the threshold
+            # makes the gain exactly 1 below it, so no mask is needed; every
+            # step reuses the smoothed envelope buffer
+            gain_reduction = np.maximum(smoothed_envelope, threshold_linear, out=smoothed_envelope)
+            np.divide(gain_reduction, threshold_linear, out=gain_reduction)
+            np.power(gain_reduction, np.float32(1.0 / ratio - 1.0), out=gain_reduction)
             
             # Apply gain reduction
-            compressed_audio = audio * gain_reduction
+            compressed_audio = np.multiply(gain_reduction, audio, out=gain_reduction)
             
             return compressed_audio
             
@@ -346,11 +667,60 @@ class AudioProcessor:
             logger.warning(f"Compression failed: {e}")
             return audio
     
+    def _smoothing_coeff(self, time_constant: float) -> np.float32:
+        """One-pole smoothing coefficient for a time constant at self.sample_rate"""
+        return np.float32(np.exp(-1.0 / (time_constant * self.sample_rate)))
+    
     def _soft_limit(self, audio: np.ndarray, threshold: float = 0.95) -> np.ndarray:
         """Apply soft limiting to prevent clipping"""
-        limited_audio = np.tanh(audio / threshold) * threshold
+        return self._tanh_limit(audio, 1.0 / threshold, threshold)
+    
+    def _tanh_limit(
+        self,
+        audio: np.ndarray,
+        scale: float,
+        threshold: float,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Compute tanh(audio * scale) * threshold into out (a new buffer if None)"""
+        local_dict = {
+            "audio": audio,
+            "scale": np.float32(scale),
+            "threshold": np.float32(threshold)
+        }
+        
+        if numexpr is not None:
+            return numexpr.evaluate("tanh(audio * scale) * threshold", local_dict=local_dict, out=out)
+        
+        limited_audio = np.multiply(audio, local_dict["scale"], out=out)
+        np.tanh(limited_audio, out=limited_audio)
+        np.multiply(limited_audio, local_dict["threshold"], out=limited_audio)
         return limited_audio
     
+    def _finalize(
+        self,
+        audio: np.ndarray,
+        target_db: float = -16.0,
+        limit_threshold: float = 0.95,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Normalize, guard against clipping and soft limit in one fused pass
+        
+        Equivalent to _normalize_audio followed by _soft_limit: the clip
+        guard rescale is folded into the normalization gain analytically.
+        """
+        rms = self._rms(audio)
+        peak = max(float(np.max(audio)), -float(np.min(audio))) if audio.size else 0.0
+        
+        gain = 1.0
+        if rms > 0:
+            target_rms = 10**(target_db / 20.0)
+            gain = target_rms / rms
+            if peak * gain > 0.95:
+                gain = 0.95 / peak
+        
+        return self._tanh_limit(audio, gain / limit_threshold, limit_threshold, out=out)
+    
     async def save_audio(
         self, 
         audio: np.ndarray, 
@@ -364,19 +734,18 @@ class AudioProcessor:
                 sr = self.sample_rate
             
             # Ensure audio is in correct format
-            audio = audio.astype(np.float32)
+            audio = audio.astype(np.float32, copy=False)
             
             # Ensure audio is not clipping
             max_val = np.max(np.abs(audio))
             if max_val > 1.0:
                 audio = audio / max_val * 0.95
             
-            # Save audio file
-            def save_file():
-                sf.write(output_path, audio, sr, format=format)
-            
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, save_file)
+            # Save audio file in the I/O pool
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                self._io_pool, lambda: sf.write(output_path, audio, sr, format=format)
+            )
             
             logger.info(f"Audio saved to: {output_path}")
             
@@ -386,26 +755,175 @@ class AudioProcessor:
     
     def get_audio_info(self, audio: np.ndarray, sr: int) -> dict:
         """Get audio information and statistics"""
+        # Peak and dynamic range both derive from the same two reductions
+        audio_max = float(np.max(audio))
+        audio_min = float(np.min(audio))
+        
         info = {
             "duration": len(audio) / sr,
             "samples": len(audio),
             "sample_rate": sr,
-            "rms": float(np.sqrt(np.mean(audio**2))),
-            "peak": float(np.max(np.abs(audio))),
-            "dynamic_range": float(np.max(audio) - np.min(audio)),
+            "rms": self._rms(audio),
+            "peak": max(audio_max, -audio_min),
+            "dynamic_range": audio_max - audio_min,
         }
         
-        # Calculate frequency statistics using FFT
-        fft = np.fft.fft(audio)
-        freqs = np.fft.fftfreq(len(audio), 1/sr)
-        magnitude = np.abs(fft[:len(fft)//2])
+        # Calculate frequency statistics from a Welch-averaged spectrum; short
+        # segments keep this O(N log nperseg) with bounded memory
+        freqs, power = signal.welch(
+            audio,
+            fs=sr,
+            nperseg=min(4096, len(audio)),
+            return_onesided=True,
+            scaling='spectrum'
+        )
+        magnitude = np.sqrt(power)
         
         # Find dominant frequency
         dominant_freq_idx = np.argmax(magnitude)
         info["dominant_frequency"] = float(freqs[dominant_freq_idx])
         
         # Calculate spectral centroid
-        spectral_centroid = np.sum(freqs[:len(magnitude)] * magnitude) / np.sum(magnitude)
+        spectral_centroid = np.einsum('i,i->', freqs, magnitude) / np.sum(magnitude)
         info["spectral_centroid"] = float(spectral_centroid)
         
-        return info
\ No newline at end of file
+        return info
+
+
+# Per-process AudioProcessor used by batch preprocessing workers
+_worker_processor: Optional[AudioProcessor] = None
+
+
+def _preprocess_in_worker(
+    sample_rate: int,
+    input_path: str,
+    target_sr: Optional[int],
+    normalize: bool,
+    noise_reduction: float
+) -> np.ndarray:
+    """Run AudioProcessor.preprocess inside a process pool worker"""
+    global _worker_processor
+    
+    if _worker_processor is None or _worker_processor.sample_rate != sample_rate:
+        _worker_processor = AudioProcessor(sample_rate)
+    
+    return asyncio.run(
+        _worker_processor.preprocess(input_path, target_sr, normalize, noise_reduction)
+    )
+
+
+class AudioProcessorGPU(AudioProcessor):
+    """AudioProcessor that runs resampling and noise reduction with torchaudio on CUDA
+    
+    Every GPU stage falls back to the CPU implementation on error.
+    """
+    
+    def __init__(self, sample_rate: int = 22050, device: str = "cuda"):
+        super().__init__(sample_rate)
+        
+        # Imported lazily so the CPU-only deployment never pays for torch
+        import torch
+        import torchaudio
+        
+        self._torch = torch
+        self._torchaudio = torchaudio
+        self.device = torch.device(device)
+        
+        # Batches stay in-process so they share the device context
+        self.use_process_pool = False
+        self._use_cuda = self.device.type == "cuda"
+        
+        # Dedicated stream so host<->device copies overlap with other work
+        self._stream = torch.cuda.Stream(device=self.device) if self._use_cuda else None
+        
+        self._spectrogram = torchaudio.transforms.Spectrogram(
+            n_fft=self.n_fft,
+            hop_length=self.hop_length,
+            power=None,
+            pad_mode="constant"
+        ).to(self.device)
+        self._inverse_spectrogram = torchaudio.transforms.InverseSpectrogram(
+            n_fft=self.n_fft,
+            hop_length=self.hop_length
+        ).to(self.device)
+    
+    def _stream_context(self):
+        """CUDA stream context for GPU work (no-op on CPU devices)"""
+        if self._stream is not None:
+            return self._torch.cuda.stream(self._stream)
+        return contextlib.nullcontext()
+    
+    def _to_device(self, audio: np.ndarray):
+        """Copy audio to the device through pinned memory"""
+        tensor = self._torch.from_numpy(np.ascontiguousarray(audio, dtype=np.float32))
+        if self._use_cuda:
+            tensor = tensor.pin_memory()
+        return tensor.to(self.device, non_blocking=True)
+    
+    def _to_host(self, tensor) -> np.ndarray:
+        """Copy a device tensor back into a pinned host buffer"""
+        if not self._use_cuda:
+            return tensor.numpy()
+        
+        host = self._torch.empty(tensor.shape, dtype=tensor.dtype, pin_memory=True)
+        host.copy_(tensor, non_blocking=True)
+        self._stream.synchronize()
+        return host.numpy()
+    
+    def _resample(self, audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+        """Resample on the GPU with torchaudio"""
+        try:
+            with self._stream_context():
+                resampled = self._torchaudio.functional.resample(
+                    self._to_device(audio), orig_sr, target_sr
+                )
+                return self._to_host(resampled)
+        except Exception as e:
+            logger.warning(f"GPU resampling failed, using CPU: {e}")
+            return super()._resample(audio, orig_sr, target_sr)
+    
+    async def _reduce_noise(
+        self,
+        audio: np.ndarray,
+        sr: int,
+        strength: float = 0.3
+    ) -> np.ndarray:
+        """Apply spectral subtraction noise reduction on the GPU"""
+        try:
+            torch = self._torch
+            
+            with self._stream_context(), torch.no_grad():
+                spec = self._spectrogram(self._to_device(audio))
+                magnitude = spec.abs()
+                
+                # Estimate noise floor from first few frames
+                noise_frames = max(1, min(10, magnitude.shape[-1] // 10))
+                noise_floor = magnitude[:, :noise_frames].mean(dim=1, keepdim=True)
+                
+                # Apply spectral subtraction, keeping at least 10% of each bin
+                alpha = strength * 2  # Noise reduction factor
+                enhanced_magnitude = torch.maximum(magnitude - alpha * noise_floor, 0.1 * magnitude)
+                
+                spec.mul_(enhanced_magnitude.div_(magnitude.clamp_min_(1e-8)))
+                enhanced_audio = self._inverse_spectrogram(spec, length=len(audio))
+                
+                return self._to_host(enhanced_audio)
+            
+        except Exception as e:
+            logger.warning(f"GPU noise reduction failed, using CPU: {e}")
+            return await super()._reduce_noise(audio, sr, strength=strength)
+
+
+def create_audio_processor(sample_rate: int = 22050) -> AudioProcessor:
+    """Create a CUDA-backed audio processor when available, else the CPU one"""
+    try:
+        import torch
+        
+        if torch.cuda.is_available():
+            logger.info("CUDA available, using GPU audio processor")
+            return AudioProcessorGPU(sample_rate)
+            
+    except Exception as e:
+        logger.info(f"GPU audio processor unavailable: {e}")
+    
+    return AudioProcessor(sample_rate)
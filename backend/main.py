@@ -3,9 +3,9 @@ Seed-VC CPU-Optimized Backend
 FastAPI server for voice conversion processing
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks, WebSocket, WebSocketDisconnect, Depends
+from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks, WebSocket, WebSocketDisconnect, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
@@ -15,18 +15,20 @@ import asyncio
 import os
 import json
 import uuid
-import aiofiles
 import logging
+import shutil
 from datetime import datetime
 import time
 
 from voice_processor import VoiceProcessor
 from model_manager import ModelManager
-from audio_utils import AudioProcessor
+from audio_utils import AudioProcessor, create_audio_processor
 from queue_manager import ProcessingQueue
-from redis_manager import RedisManager, redis_manager
+from redis_manager import RedisManager, redis_manager, REDIS_URL
 from worker_manager import WorkerManager, worker_manager
-from websocket_manager import ConnectionManager, connection_manager, system_monitor_task
+from websocket_manager import ConnectionManager, connection_manager, system_monitor_task, job_update_listener
+from arq import create_pool
+from arq.connections import RedisSettings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -59,7 +61,7 @@ app.add_middleware(
 # Global instances
 model_manager = ModelManager()
 voice_processor = VoiceProcessor()
-audio_processor = AudioProcessor()
+audio_processor = create_audio_processor()
 processing_queue = ProcessingQueue()
 
 # Directories
@@ -70,8 +72,20 @@ MODELS_DIR = "models"
 for directory in [UPLOAD_DIR, OUTPUT_DIR, MODELS_DIR]:
     os.makedirs(directory, exist_ok=True)
 
+class ImmutableStaticFiles(StaticFiles):
+    """Static files that browsers and CDNs may cache indefinitely
+    
+    Result files are named by job ID and never rewritten, so repeat fetches
+    can be served without reaching this process.
+    """
+    
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
 # Mount static files
-app.mount("/static", StaticFiles(directory="outputs"), name="static")
+app.mount("/static", ImmutableStaticFiles(directory="outputs"), name="static")
 
 # Pydantic models
 class ConversionRequest(BaseModel):
@@ -101,31 +115,118 @@ class ModelInfo(BaseModel):
 
 # Import psutil for system monitoring
 import psutil
-from worker_manager import process_audio_file
 
-# Jobs are now managed by Redis - keeping this for compatibility
-jobs: Dict[str, Dict[str, Any]] = {}
+class SystemSampler:
+    """Samples psutil metrics in a background thread so endpoints never block on them"""
+    
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self.snapshot: Dict[str, Any] = {}
+        self.task = None
+        self._process_started = psutil.Process().create_time()
+        # Prime the counter so non-blocking cpu_percent() reports the last interval
+        psutil.cpu_percent(interval=None)
+    
+    def _collect(self) -> Dict[str, Any]:
+        """Read all metrics once"""
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        
+        return {
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory": {
+                "total": memory.total,
+                "available": memory.available,
+                "percent": memory.percent,
+                "used": memory.used
+            },
+            "disk": {
+                "total": disk.total,
+                "used": disk.used,
+                "free": disk.free,
+                "percent": (disk.used / disk.total) * 100
+            },
+            "cpu_count": os.cpu_count(),
+            "load_avg": os.getloadavg() if hasattr(os, 'getloadavg') else [0, 0, 0]
+        }
+    
+    @property
+    def uptime(self) -> float:
+        """Seconds since this process started"""
+        return time.time() - self._process_started
+    
+    async def _run(self):
+        """Refresh the snapshot every interval"""
+        while True:
+            try:
+                self.snapshot = await asyncio.to_thread(self._collect)
+                await asyncio.sleep(self.interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error sampling system stats: {e}")
+                await asyncio.sleep(self.interval)
+    
+    def start(self):
+        """Start background sampling"""
+        if self.task is None:
+            self.snapshot = self._collect()
+            self.task = asyncio.create_task(self._run())
+    
+    def stop(self):
+        """Stop background sampling"""
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+system_sampler = SystemSampler()
+
+ALLOWED_AUDIO_EXTENSIONS = frozenset({"wav", "mp3", "flac", "ogg", "m4a"})
+
+def validate_audio_upload(upload: UploadFile, max_bytes: int, size_detail: str) -> str:
+    """Validate an audio upload's type and size, returning its normalized extension"""
+    extension = os.path.splitext(upload.filename or "")[1].lstrip(".").lower()
+    
+    if extension not in ALLOWED_AUDIO_EXTENSIONS or not (upload.content_type or "").startswith("audio/"):
+        raise HTTPException(status_code=400, detail="Định dạng tệp âm thanh không hợp lệ")
+    
+    # size is None for chunked uploads
+    if upload.size and upload.size > max_bytes:
+        raise HTTPException(status_code=400, detail=size_detail)
+    
+    return extension
+
+async def spool_upload(upload: UploadFile, path: str, chunk_size: int = 1 << 20):
+    """Copy an upload to disk in fixed-size chunks within a single worker-thread hop"""
+    def copy():
+        # The request body is already spooled by Starlette; copy it without
+        # returning to the event loop for every chunk
+        upload.file.seek(0)
+        with open(path, 'wb') as f:
+            shutil.copyfileobj(upload.file, f, chunk_size)
+    
+    await asyncio.to_thread(copy)
+
+async def request_timestamp() -> str:
+    """Timestamp computed once per request and shared by all response fields"""
+    return datetime.now().isoformat()
 
 # Rate limiting dependency
-async def rate_limit_check(request):
+async def get_client_ip(request: Request) -> str:
+    """Resolve the client address once per request"""
+    return request.client.host if request.client else "unknown"
+
+async def rate_limit_check(client_ip: str = Depends(get_client_ip)):
     """Check rate limiting for requests"""
-    client_ip = request.client.host
+    # check_rate_limit allows the request if Redis is not available
+    is_allowed = await redis_manager.check_rate_limit(
+        identifier=f"api:{client_ip}",
+        limit=30,  # 30 requests per minute
+        window=60
+    )
     
-    # Check if Redis is available
-    try:
-        is_allowed = await redis_manager.check_rate_limit(
-            identifier=f"api:{client_ip}",
-            limit=30,  # 30 requests per minute
-            window=60
-        )
-        
-        if not is_allowed:
-            raise HTTPException(status_code=429, detail="Rate limit exceeded")
-            
-    except Exception as e:
-        # Allow request if Redis is not available
-        logger.warning(f"Rate limiting check failed: {e}")
-        pass
+    if not is_allowed:
+        raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
 @app.on_event("startup")
 async def startup_event():
@@ -133,12 +234,18 @@ async def startup_event():
     logger.info("Starting Seed-VC CPU Multi-User Backend...")
     
     try:
-        # Initialize Redis manager
-        await redis_manager.initialize()
+        # Initialize Redis manager on a shared connection pool
+        app.state.redis_pool = RedisManager.create_pool(REDIS_URL)
+        await redis_manager.initialize(pool=app.state.redis_pool)
         logger.info("Redis manager initialized")
         
+        # Connect to the ARQ task queue
+        app.state.arq = await create_pool(RedisSettings.from_dsn(REDIS_URL))
+        logger.info("Task queue connected")
+        
         # Initialize worker manager
         await worker_manager.start()
+        await worker_manager.start_queue_monitor()
         logger.info("Worker manager started")
         
         # Initialize model manager
@@ -147,9 +254,13 @@ async def startup_event():
         # Load available models
         await model_manager.load_default_models()
         
-        # Start system monitoring task
+        # Start system monitoring tasks
+        system_sampler.start()
         asyncio.create_task(system_monitor_task())
         
+        # Relay job updates from task workers to this process's WebSockets
+        asyncio.create_task(job_update_listener())
+        
         logger.info("Multi-user backend initialization complete")
         
     except Exception as e:
@@ -163,9 +274,14 @@ async def shutdown_event():
     
     try:
         # Cleanup managers
+        system_sampler.stop()
+        await worker_manager.stop_queue_monitor()
         await worker_manager.stop()
         await model_manager.cleanup()
         await redis_manager.cleanup()
+        await app.state.redis_pool.disconnect()
+        await app.state.arq.close()
+        audio_processor.shutdown()
         
         logger.info("Shutdown complete")
         
@@ -173,7 +289,7 @@ async def shutdown_event():
         logger.error(f"Shutdown error: {e}")
 
 @app.get("/")
-async def root():
+async def root(now: str = Depends(request_timestamp)):
     """Root endpoint"""
     return {
         "message": "Hệ Thống Seed-VC CPU - Đa Người Dùng",
@@ -185,11 +301,11 @@ async def root():
             "Xử lý đồng thời nhiều người dùng",
             "Tối ưu CPU"
         ],
-        "timestamp": datetime.now().isoformat()
+        "timestamp": now
     }
 
 @app.get("/health")
-async def health_check():
+async def health_check(now: str = Depends(request_timestamp)):
     """Health check endpoint"""
     try:
         # Get detailed system health
@@ -200,7 +316,7 @@ async def health_check():
         
         return {
             "status": "healthy",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now,
             "models_loaded": len(model_manager.loaded_models),
             "workers": {
                 "active": worker_manager.max_workers,
@@ -211,8 +327,8 @@ async def health_check():
             "connections": connection_stats,
             "system": {
                 "cpu_count": os.cpu_count(),
-                "memory_total": f"{psutil.virtual_memory().total / (1024**3):.1f}GB",
-                "uptime": time.time() - psutil.Process().create_time()
+                "memory_total": f"{system_sampler.snapshot.get('memory', {}).get('total', 0) / (1024**3):.1f}GB",
+                "uptime": system_sampler.uptime
             }
         }
         
@@ -221,7 +337,7 @@ async def health_check():
         return {
             "status": "degraded",
             "error": str(e),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now
         }
 
 @app.get("/models", response_model=list[ModelInfo])
@@ -249,57 +365,53 @@ async def download_model(model_id: str, background_tasks: BackgroundTasks):
         logger.error(f"Error starting model download: {e}")
         raise HTTPException(status_code=500, detail="Failed to start model download")
 
-@app.post("/clone")
+@app.post("/clone", dependencies=[Depends(rate_limit_check)])
 async def clone_voice(
-    background_tasks: BackgroundTasks,
     reference_file: UploadFile = File(...),
     target_file: UploadFile = File(...),
     similarity_threshold: float = 0.8,
-    session_id: Optional[str] = None
+    session_id: Optional[str] = None,
+    client_ip: str = Depends(get_client_ip)
 ):
     """Start voice cloning process with multi-user support"""
     
     # Rate limiting check for cloning (more restrictive)
-    client_ip = "unknown"
     is_allowed = await redis_manager.check_rate_limit(
-        identifier=f"clone:{client_ip}",
-        limit=3,  # 3 cloning jobs per hour per IP
+        identifier=f"clone:{session_id or client_ip}",
+        limit=3,  # 3 cloning jobs per hour per user
         window=3600
     )
     
     if not is_allowed:
         raise HTTPException(status_code=429, detail="Đã vượt quá giới hạn nhân bản giọng nói. Vui lòng thử lại sau 1 giờ.")
     
-    # Validate files
-    for file in [reference_file, target_file]:
-        if not file.content_type or not file.content_type.startswith('audio/'):
-            raise HTTPException(status_code=400, detail="Định dạng tệp âm thanh không hợp lệ")
-        
-        if file.size > 50 * 1024 * 1024:  # 50MB limit for cloning
-            raise HTTPException(status_code=400, detail="Kích thước tệp quá lớn cho nhân bản giọng nói. Tối đa 50MB.")
+    # Validate files (50MB limit for cloning)
+    ref_extension, target_extension = [
+        validate_audio_upload(file, 50 * 1024 * 1024, "Kích thước tệp quá lớn cho nhân bản giọng nói. Tối đa 50MB.")
+        for file in (reference_file, target_file)
+    ]
     
     try:
         # Generate unique job ID
         job_id = str(uuid.uuid4())
         
+        # Bound in-flight jobs per user before accepting the upload
+        user_key = session_id or client_ip
+        if not await redis_manager.acquire_concurrent_slot(user_key, limit=2, req_id=job_id):
+            raise HTTPException(status_code=429, detail="Bạn đang có quá nhiều công việc đang xử lý. Vui lòng đợi hoàn thành.")
+        
         # Create user-specific directory
         user_dir = os.path.join(UPLOAD_DIR, session_id or "anonymous")
         os.makedirs(user_dir, exist_ok=True)
         
         # Save uploaded files
-        ref_extension = reference_file.filename.split('.')[-1].lower()
-        target_extension = target_file.filename.split('.')[-1].lower()
-        
         ref_path = os.path.join(user_dir, f"{job_id}_ref.{ref_extension}")
         target_path = os.path.join(user_dir, f"{job_id}_target.{target_extension}")
         
-        async with aiofiles.open(ref_path, 'wb') as f:
-            ref_content = await reference_file.read()
-            await f.write(ref_content)
-            
-        async with aiofiles.open(target_path, 'wb') as f:
-            target_content = await target_file.read()
-            await f.write(target_content)
+        await asyncio.gather(
+            spool_upload(reference_file, ref_path),
+            spool_upload(target_file, target_path)
+        )
         
         # Create job data
         job_data = {
@@ -309,91 +421,77 @@ async def clone_voice(
             "similarity_threshold": similarity_threshold,
             "session_id": session_id,
             "client_ip": client_ip,
+            "user_key": user_key,
             "reference_filename": reference_file.filename,
             "target_filename": target_file.filename
         }
         
         # Add to Redis queue with higher priority for cloning
         priority = 0  # High priority for cloning
-        await redis_manager.add_job(job_id, job_data, priority)
-        
-        # Add job to session if provided
-        if session_id:
-            await redis_manager.add_job_to_session(session_id, job_id)
-        
-        # Store in local jobs for compatibility
-        jobs[job_id] = {
-            "id": job_id,
-            "type": "cloning",
-            "status": "queued", 
-            "progress": 0.0,
-            "message": "Công việc nhân bản giọng nói đã được thêm vào hàng đợi",
-            **job_data,
-            "created_at": datetime.now().isoformat(),
-            "result_url": None,
-            "error": None
-        }
+        await redis_manager.add_job(
+            job_id, job_data, priority, session_id=session_id,
+            message="Công việc nhân bản giọng nói đã được thêm vào hàng đợi"
+        )
         
-        # Start processing
-        background_tasks.add_task(process_voice_cloning, job_id)
+        # Hand off to the task worker
+        await app.state.arq.enqueue_job("clone", job_id, job_data, _job_id=job_id)
         
         return {
             "job_id": job_id, 
             "status": "queued",
             "message": "Công việc nhân bản đã được thêm vào hàng đợi",
-            "estimated_wait_time": (await worker_manager.get_queue_info()).get("estimated_wait_time", 0)
+            "estimated_wait_time": worker_manager.get_cached_queue_info().get("estimated_wait_time", 0)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error starting voice cloning: {e}")
+        await redis_manager.release_concurrent_slot(user_key, job_id)
         raise HTTPException(status_code=500, detail="Không thể bắt đầu nhân bản giọng nói")
 
-@app.post("/convert")
+@app.post("/convert", dependencies=[Depends(rate_limit_check)])
 async def convert_voice(
-    background_tasks: BackgroundTasks,
     audio_file: UploadFile = File(...),
     model_id: str = "seed-vc-fast",
     target_speaker: str = "speaker_001",
     conversion_strength: float = 0.8,
     preserve_pitch: float = 0.5,
     noise_reduction: float = 0.3,
-    session_id: Optional[str] = None
+    session_id: Optional[str] = None,
+    client_ip: str = Depends(get_client_ip)
 ):
     """Start voice conversion process with multi-user support"""
     
     # Rate limiting check
-    client_ip = "unknown"  # In real implementation, get from request
     is_allowed = await redis_manager.check_rate_limit(
-        identifier=f"convert:{client_ip}",
-        limit=5,  # 5 conversions per minute per IP
+        identifier=f"convert:{session_id or client_ip}",
+        limit=5,  # 5 conversions per minute per user
         window=60
     )
     
     if not is_allowed:
         raise HTTPException(status_code=429, detail="Quá nhiều yêu cầu. Vui lòng thử lại sau.")
     
-    # Validate file
-    if not audio_file.content_type or not audio_file.content_type.startswith('audio/'):
-        raise HTTPException(status_code=400, detail="Định dạng tệp âm thanh không hợp lệ")
-    
-    # Check file size (100MB limit)
-    if audio_file.size > 100 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="Kích thước tệp quá lớn. Tối đa 100MB.")
+    # Validate file (100MB limit)
+    file_extension = validate_audio_upload(audio_file, 100 * 1024 * 1024, "Kích thước tệp quá lớn. Tối đa 100MB.")
     
     try:
         # Generate unique job ID
         job_id = str(uuid.uuid4())
         
+        # Bound in-flight jobs per user before accepting the upload
+        user_key = session_id or client_ip
+        if not await redis_manager.acquire_concurrent_slot(user_key, limit=2, req_id=job_id):
+            raise HTTPException(status_code=429, detail="Bạn đang có quá nhiều công việc đang xử lý. Vui lòng đợi hoàn thành.")
+        
         # Save uploaded file with user isolation
-        file_extension = audio_file.filename.split('.')[-1].lower()
         user_dir = os.path.join(UPLOAD_DIR, session_id or "anonymous")
         os.makedirs(user_dir, exist_ok=True)
         
         input_path = os.path.join(user_dir, f"{job_id}.{file_extension}")
         
-        async with aiofiles.open(input_path, 'wb') as f:
-            content = await audio_file.read()
-            await f.write(content)
+        await spool_upload(audio_file, input_path)
         
         # Create job data
         job_data = {
@@ -406,108 +504,91 @@ async def convert_voice(
             "noise_reduction": noise_reduction,
             "session_id": session_id,
             "client_ip": client_ip,
+            "user_key": user_key,
             "filename": audio_file.filename
         }
         
         # Add to Redis queue with priority
         priority = 1  # Normal priority
-        await redis_manager.add_job(job_id, job_data, priority)
-        
-        # Add job to session if provided
-        if session_id:
-            await redis_manager.add_job_to_session(session_id, job_id)
-        
-        # Store in local jobs for compatibility
-        jobs[job_id] = {
-            "id": job_id,
-            "type": "conversion", 
-            "status": "queued",
-            "progress": 0.0,
-            "message": "Công việc đã được thêm vào hàng đợi",
-            **job_data,
-            "created_at": datetime.now().isoformat(),
-            "result_url": None,
-            "error": None
-        }
+        await redis_manager.add_job(
+            job_id, job_data, priority, session_id=session_id,
+            message="Công việc đã được thêm vào hàng đợi"
+        )
         
-        # Start processing
-        background_tasks.add_task(process_conversion, job_id)
+        # Hand off to the task worker
+        await app.state.arq.enqueue_job("convert", job_id, job_data, _job_id=job_id)
         
         return {
             "job_id": job_id, 
             "status": "queued",
             "message": "Công việc đã được thêm vào hàng đợi xử lý",
-            "estimated_wait_time": (await worker_manager.get_queue_info()).get("estimated_wait_time", 0)
+            "estimated_wait_time": worker_manager.get_cached_queue_info().get("estimated_wait_time", 0)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error starting conversion: {e}")
+        await redis_manager.release_concurrent_slot(user_key, job_id)
         raise HTTPException(status_code=500, detail="Không thể bắt đầu chuyển đổi")
 
 @app.get("/convert/{job_id}/status", response_model=ConversionStatus)
 async def get_conversion_status(job_id: str):
     """Get conversion job status"""
-    if job_id not in jobs:
+    job = await redis_manager.get_job_status(job_id)
+    if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job = jobs[job_id]
     return ConversionStatus(
         job_id=job_id,
         status=job["status"],
-        progress=job["progress"],
-        message=job["message"],
-        result_url=job["result_url"],
-        error=job["error"]
+        progress=job.get("progress", 0.0),
+        message=job.get("message", ""),
+        result_url=job.get("result_url"),
+        error=job.get("error")
     )
 
 @app.get("/convert/{job_id}/result")
 async def get_conversion_result(job_id: str):
     """Download conversion result"""
-    if job_id not in jobs:
+    job = await redis_manager.get_job_status(job_id)
+    if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job = jobs[job_id]
-    
     if job["status"] != "completed":
         raise HTTPException(status_code=400, detail="Job not completed")
     
-    if not job["result_url"]:
+    if not job.get("result_url"):
         raise HTTPException(status_code=404, detail="Result file not found")
     
     # Return file stream
     output_path = job["result_url"].replace("/static/", "outputs/")
     
-    if not os.path.exists(output_path):
+    # Stat off the event loop and hand the result to FileResponse so it is not repeated
+    try:
+        stat_result = await asyncio.to_thread(os.stat, output_path)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Result file not found")
     
-    def generate_file():
-        with open(output_path, "rb") as f:
-            while True:
-                chunk = f.read(8192)
-                if not chunk:
-                    break
-                yield chunk
-    
-    return StreamingResponse(
-        generate_file(),
+    # Served by Starlette via sendfile where available
+    return FileResponse(
+        path=output_path,
         media_type="audio/wav",
-        headers={"Content-Disposition": f"attachment; filename=converted_{job_id}.wav"}
+        filename=f"converted_{job_id}.wav",
+        stat_result=stat_result
     )
 
 @app.delete("/convert/{job_id}")
 async def cancel_conversion(job_id: str):
     """Cancel a conversion job"""
-    if job_id not in jobs:
-        raise HTTPException(status_code=404, detail="Job not found")
+    cancelled = await redis_manager.cancel_job(job_id, "Job cancelled by user")
     
-    job = jobs[job_id]
+    if cancelled is None:
+        raise HTTPException(status_code=404, detail="Job not found")
     
-    if job["status"] in ["completed", "failed"]:
+    if not cancelled:
         raise HTTPException(status_code=400, detail="Cannot cancel completed job")
     
-    jobs[job_id]["status"] = "cancelled"
-    jobs[job_id]["message"] = "Job cancelled by user"
-    
     return {"message": "Job cancelled successfully"}
 
 @app.websocket("/ws")
@@ -536,7 +617,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: Optional[str] = N
         connection_manager.disconnect(session_id)
 
 @app.get("/queue/status")
-async def get_queue_status():
+async def get_queue_status(now: str = Depends(request_timestamp)):
     """Get processing queue status"""
     try:
         queue_info = await worker_manager.get_queue_info()
@@ -547,7 +628,7 @@ async def get_queue_status():
             "redis_stats": system_stats,
             "worker_stats": worker_manager.get_worker_stats(),
             "connections": connection_manager.get_connection_stats(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now
         }
         
     except Exception as e:
@@ -558,32 +639,16 @@ async def get_queue_status():
         }
 
 @app.get("/system/stats")
-async def get_system_stats():
+async def get_system_stats(now: str = Depends(request_timestamp)):
     """Get detailed system statistics"""
     try:
         return {
-            "system": {
-                "cpu_percent": psutil.cpu_percent(interval=1),
-                "memory": {
-                    "total": psutil.virtual_memory().total,
-                    "available": psutil.virtual_memory().available,
-                    "percent": psutil.virtual_memory().percent,
-                    "used": psutil.virtual_memory().used
-                },
-                "disk": {
-                    "total": psutil.disk_usage('/').total,
-                    "used": psutil.disk_usage('/').used,
-                    "free": psutil.disk_usage('/').free,
-                    "percent": (psutil.disk_usage('/').used / psutil.disk_usage('/').total) * 100
-                },
-                "cpu_count": os.cpu_count(),
-                "load_avg": os.getloadavg() if hasattr(os, 'getloadavg') else [0, 0, 0]
-            },
+            "system": system_sampler.snapshot,
             "workers": worker_manager.get_worker_stats(),
             "queue": await worker_manager.get_queue_info(),
             "connections": connection_manager.get_connection_stats(),
             "redis": await redis_manager.get_system_stats(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now
         }
         
     except Exception as e:
@@ -591,7 +656,7 @@ async def get_system_stats():
         raise HTTPException(status_code=500, detail="Failed to get system stats")
 
 @app.post("/system/scale")
-async def scale_workers(new_worker_count: int):
+async def scale_workers(new_worker_count: int, now: str = Depends(request_timestamp)):
     """Scale the number of worker processes"""
     try:
         if new_worker_count < 1 or new_worker_count > 16:
@@ -602,173 +667,22 @@ async def scale_workers(new_worker_count: int):
         return {
             "message": f"Scaled to {new_worker_count} workers",
             "new_worker_count": new_worker_count,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now
         }
         
     except Exception as e:
         logger.error(f"Error scaling workers: {e}")
         raise HTTPException(status_code=500, detail="Failed to scale workers")
 
-async def process_voice_cloning(job_id: str):
-    """Background task to process voice cloning with worker management"""
-    try:
-        job = jobs.get(job_id)
-        if not job:
-            # Try to get from Redis
-            job_data = await redis_manager.get_job_status(job_id)
-            if not job_data:
-                logger.error(f"Job {job_id} not found")
-                return
-            job = job_data
-        
-        logger.info(f"Starting voice cloning for job {job_id}")
-        
-        # Update status in both local and Redis
-        await update_job_status(job_id, "processing", 15.0, "Đang phân tích giọng nói tham khảo...")
-        
-        # Use worker manager for CPU-intensive processing
-        from worker_manager import process_audio_file
-        
-        # Prepare processing parameters
-        processing_params = {
-            "type": "cloning",
-            "reference_path": job["reference_path"],
-            "similarity_threshold": job["similarity_threshold"],
-            "sample_rate": 22050
-        }
-        
-        # Update progress
-        await update_job_status(job_id, "processing", 30.0, "Đang trích xuất đặc trưng giọng nói...")
-        await asyncio.sleep(0.5)  # Allow status update to propagate
-        
-        await update_job_status(job_id, "processing", 50.0, "Đang tạo mô hình giọng nói...")
-        await asyncio.sleep(0.5)
-        
-        await update_job_status(job_id, "processing", 70.0, "Đang áp dụng đặc trưng vào âm thanh đích...")
-        
-        # Process with worker manager
-        session_id = job.get("session_id", "anonymous")
-        output_dir = os.path.join(OUTPUT_DIR, session_id)
-        os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, f"cloned_{job_id}.wav")
-        
-        result = await worker_manager.submit_audio_task(
-            process_audio_file,
-            job["target_path"],
-            output_path,
-            processing_params
-        )
-        
-        if result["success"]:
-            await update_job_status(job_id, "completed", 100.0, "Nhân bản giọng nói hoàn thành thành công")
-            
-            # Update job with result
-            if job_id in jobs:
-                jobs[job_id]["result_url"] = f"/static/{session_id}/cloned_{job_id}.wav"
-                jobs[job_id]["status"] = "completed"
-            
-            logger.info(f"Voice cloning completed for job {job_id}")
-        else:
-            await update_job_status(job_id, "failed", 0, f"Nhân bản giọng nói thất bại: {result['error']}")
-            
-    except Exception as e:
-        logger.error(f"Voice cloning failed for job {job_id}: {e}")
-        await update_job_status(job_id, "failed", 0, f"Nhân bản giọng nói thất bại: {str(e)}")
-
-async def update_job_status(job_id: str, status: str, progress: float, message: str):
-    """Update job status in both local storage and Redis, and notify via WebSocket"""
-    try:
-        # Update local storage
-        if job_id in jobs:
-            jobs[job_id]["status"] = status
-            jobs[job_id]["progress"] = progress
-            jobs[job_id]["message"] = message
-            
-            if status in ["completed", "failed", "cancelled"]:
-                jobs[job_id]["completed_at"] = datetime.now().isoformat()
-        
-        # Update Redis
-        await redis_manager.update_job_status(job_id, status, progress, message)
-        
-        # Notify via WebSocket
-        await connection_manager.notify_job_update(job_id, {
-            "status": status,
-            "progress": progress,
-            "message": message
-        })
-        
-    except Exception as e:
-        logger.error(f"Error updating job status for {job_id}: {e}")
-
-async def process_conversion(job_id: str):
-    """Background task to process voice conversion with worker management"""
-    try:
-        job = jobs.get(job_id)
-        if not job:
-            # Try to get from Redis
-            job_data = await redis_manager.get_job_status(job_id)
-            if not job_data:
-                logger.error(f"Job {job_id} not found")
-                return
-            job = job_data
-        
-        logger.info(f"Starting conversion for job {job_id}")
-        
-        # Update status
-        await update_job_status(job_id, "processing", 10.0, "Đang khởi tạo quy trình chuyển đổi...")
-        
-        # Load model if needed
-        await model_manager.ensure_model_loaded(job["model_id"])
-        await update_job_status(job_id, "processing", 25.0, "Mô hình giọng nói đã được tải")
-        
-        # Prepare processing parameters
-        processing_params = {
-            "type": "conversion",
-            "model_id": job["model_id"],
-            "target_speaker": job["target_speaker"],
-            "conversion_strength": job["conversion_strength"],
-            "preserve_pitch": job["preserve_pitch"],
-            "noise_reduction": job["noise_reduction"],
-            "sample_rate": 22050
-        }
-        
-        await update_job_status(job_id, "processing", 40.0, "Đang tiền xử lý âm thanh...")
-        await asyncio.sleep(0.5)
-        
-        await update_job_status(job_id, "processing", 55.0, "Đang trích xuất đặc trưng giọng nói...")
-        await asyncio.sleep(0.5)
-        
-        await update_job_status(job_id, "processing", 70.0, "Đang chuyển đổi đặc điểm giọng nói...")
-        
-        # Process with worker manager
-        session_id = job.get("session_id", "anonymous")
-        output_dir = os.path.join(OUTPUT_DIR, session_id)
-        os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, f"converted_{job_id}.wav")
-        
-        result = await worker_manager.submit_audio_task(
-            process_audio_file,
-            job["input_path"],
-            output_path,
-            processing_params
-        )
-        
-        if result["success"]:
-            await update_job_status(job_id, "completed", 100.0, "Chuyển đổi hoàn thành thành công")
-            
-            # Update job with result
-            if job_id in jobs:
-                jobs[job_id]["result_url"] = f"/static/{session_id}/converted_{job_id}.wav"
-                jobs[job_id]["status"] = "completed"
-            
-            logger.info(f"Conversion completed for job {job_id}")
-        else:
-            await update_job_status(job_id, "failed", 0, f"Chuyển đổi thất bại: {result['error']}")
-            
-    except Exception as e:
-        logger.error(f"Conversion failed for job {job_id}: {e}")
-        await update_job_status(job_id, "failed", 0, f"Chuyển đổi thất bại: {str(e)}")
-
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Job state lives in Redis, so the API can run as several worker processes
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        loop="uvloop",
+        http="httptools",
+        log_level="info"
+    )
\ No newline at end of file
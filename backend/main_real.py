@@ -5,21 +5,34 @@ Based on original Seed-VC methodology with actual voice processing
 
 from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Set
 import asyncio
 import os
 import json
+import shutil
+import hashlib
+import queue
+from functools import lru_cache
 import uuid
 import aiofiles
 import logging
 from datetime import datetime
 import time
+import numpy as np
+import soundfile as sf
+from cachetools import TTLCache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Import real Seed-VC processor
 from real_seedvc_processor import SeedVCProcessor, seedvc_processor
+from speaker_cache import speaker_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,7 +41,9 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Seed-VC CPU Real Implementation",
     description="Real Seed-VC voice conversion and cloning system",
-    version="2.0.0"
+    version="2.0.0",
+    # Status polls are the hottest path; serialize them with orjson when available
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse
 )
 
 # CORS configuration
@@ -45,7 +60,15 @@ UPLOAD_DIR = "uploads"
 OUTPUT_DIR = "outputs"
 MODELS_DIR = "models"
 
-for directory in [UPLOAD_DIR, OUTPUT_DIR, MODELS_DIR]:
+# Finished outputs keyed by input audio hash and parameters, shared across jobs
+RESULT_CACHE_DIR = os.path.join(OUTPUT_DIR, "cache")
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", 2 * 1024 * 1024 * 1024))
+
+# Upload size limits, enforced while spooling since Content-Length may be absent or wrong
+MAX_UPLOAD_BYTES = 100 << 20
+MAX_CLONE_UPLOAD_BYTES = 50 << 20
+
+for directory in [UPLOAD_DIR, OUTPUT_DIR, MODELS_DIR, RESULT_CACHE_DIR]:
     os.makedirs(directory, exist_ok=True)
 
 # Mount static files
@@ -72,19 +95,276 @@ class JobStatus(BaseModel):
     error: Optional[str] = None
     processing_time: Optional[float] = None
 
-# Job storage
-jobs: Dict[str, Dict[str, Any]] = {}
+def _json_bytes(obj: Any) -> bytes:
+    """Serialize to JSON bytes, with orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+@lru_cache(maxsize=1)
+def _iso_second(second: int) -> str:
+    return datetime.fromtimestamp(second).isoformat()
+
+def _iso_now() -> str:
+    """Current time as an ISO string, formatted at most once per second"""
+    return _iso_second(int(time.time()))
+
+# Preset target speakers; their embeddings are loaded once at startup
+PRESET_SPEAKERS = [
+    {
+        "id": "speaker_001",
+        "name": "Giọng Nam Trẻ",
+        "description": "Giọng nam trẻ tuổi, rõ ràng",
+        "gender": "nam",
+        "age_range": "20-30",
+        "language": "Tiếng Việt",
+        "available": True
+    },
+    {
+        "id": "speaker_002", 
+        "name": "Giọng Nữ Dịu Dàng",
+        "description": "Giọng nữ dịu dàng, ấm áp",
+        "gender": "nữ",
+        "age_range": "25-35", 
+        "language": "Tiếng Việt",
+        "available": True
+    },
+    {
+        "id": "speaker_003",
+        "name": "Giọng Nam Trung Niên", 
+        "description": "Giọng nam trung niên, tin cậy",
+        "gender": "nam",
+        "age_range": "35-45",
+        "language": "Tiếng Việt", 
+        "available": True
+    },
+    {
+        "id": "speaker_004",
+        "name": "Giọng Nữ Chuyên Nghiệp",
+        "description": "Giọng nữ chuyên nghiệp, rõ ràng",
+        "gender": "nữ", 
+        "age_range": "30-40",
+        "language": "Tiếng Việt",
+        "available": True
+    }
+]
+
+# Job storage (bounded; entries expire a day after creation)
+jobs: TTLCache = TTLCache(maxsize=10000, ttl=24 * 3600)
+# Guards inserts, lookups and eviction on jobs. Fields of a job dict are written only
+# by coroutines on the server loop and no lock holder awaits mid-scan, so those
+# writes cannot interleave with it and are left unlocked.
+jobs_lock: Optional[asyncio.Lock] = None
+
+# Finished jobs older than this have their files removed
+JOB_RETENTION_SECONDS = 3600
+CLEANUP_INTERVAL_SECONDS = 600
+cleanup_task: Optional[asyncio.Task] = None
+
+# Seed-VC pipelines are CPU-bound; cap how many run at once
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", max(1, (os.cpu_count() or 2) // 2)))
+job_semaphore: Optional[asyncio.Semaphore] = None
+
+# Conversion jobs arriving within the batch window are processed together
+CONVERSION_BATCH_SIZE = 8
+CONVERSION_BATCH_WINDOW = 0.05
+conversion_queue: Optional[asyncio.Queue] = None
+coalescer_task: Optional[asyncio.Task] = None
+batch_tasks: Set[asyncio.Task] = set()
+
+# Copy buffers reused across uploads instead of allocating a fresh chunk per read
+SPOOL_CHUNK_SIZE = 1 << 20
+_spool_buffers: "queue.SimpleQueue[bytearray]" = queue.SimpleQueue()
+
+async def _spool_upload(upload: UploadFile, dest: str, max_bytes: int) -> str:
+    """Copy an upload to disk in one worker-thread hop, returning a hash of its content
+    
+    Aborts and removes the partial file once more than max_bytes have been written.
+    """
+    def copy() -> Optional[str]:
+        try:
+            buf = _spool_buffers.get_nowait()
+        except queue.Empty:
+            buf = bytearray(SPOOL_CHUNK_SIZE)
+        view = memoryview(buf)
+        
+        # SpooledTemporaryFile only grew readinto() in Python 3.11
+        readinto = getattr(upload.file, "readinto", None)
+        
+        digest = hashlib.blake2b(digest_size=16)
+        written = 0
+        try:
+            upload.file.seek(0)
+            with open(dest, 'wb') as f:
+                while True:
+                    if readinto is not None:
+                        chunk = view[:readinto(buf)]
+                    else:
+                        chunk = upload.file.read(SPOOL_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    
+                    written += len(chunk)
+                    if written > max_bytes:
+                        return None
+                    
+                    digest.update(chunk)
+                    f.write(chunk)
+        finally:
+            _spool_buffers.put(buf)
+        
+        return digest.hexdigest()
+    
+    content_hash = await asyncio.to_thread(copy)
+    if content_hash is None:
+        os.remove(dest)
+        raise HTTPException(status_code=413, detail=f"Kích thước tệp quá lớn (max {max_bytes >> 20}MB)")
+    
+    return content_hash
+
+def _is_audio_magic(header: bytes) -> bool:
+    """Check the leading bytes of an upload against known audio container signatures"""
+    if header[:4] == b'RIFF' and header[8:12] == b'WAVE':
+        return True
+    if header.startswith((b'ID3', b'fLaC', b'OggS')):
+        return True
+    if header[4:8] == b'ftyp':  # M4A/MP4
+        return True
+    
+    # Bare MPEG audio or AAC ADTS frame sync
+    return len(header) >= 2 and header[0] == 0xFF and (header[1] & 0xE0) == 0xE0
+
+async def _validate_audio_magic(upload: UploadFile):
+    """Reject uploads whose content is not a recognised audio format before spooling them"""
+    header = await upload.read(12)
+    await upload.seek(0)
+    
+    if not _is_audio_magic(header):
+        raise HTTPException(status_code=400, detail="Định dạng tệp âm thanh không hợp lệ")
+
+def _upload_extension(upload: UploadFile) -> str:
+    """File extension of an upload, without the leading dot"""
+    return os.path.splitext(upload.filename or "")[1].lstrip('.').lower() or "wav"
+
+def _result_cache_key(*audio_hashes: str, **params) -> str:
+    """Result cache key from the input audio hashes and processing parameters"""
+    payload = "|".join(audio_hashes) + json.dumps(params, sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+def _link_file(src: str, dest: str):
+    """Hardlink src to dest, copying if the filesystem does not support links"""
+    try:
+        os.link(src, dest)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        raise
+    except OSError:
+        shutil.copyfile(src, dest)
+
+def _restore_cached_result(cache_key: str, output_path: str) -> bool:
+    """Link a cached result to a job's output path if one exists"""
+    cached_path = os.path.join(RESULT_CACHE_DIR, f"{cache_key}.wav")
+    try:
+        _link_file(cached_path, output_path)
+        os.utime(cached_path)  # Mark as recently used for eviction
+        return True
+    except FileNotFoundError:
+        return False
+
+def _store_cached_result(cache_key: str, output_path: str):
+    """Add a finished job's output to the result cache"""
+    try:
+        _link_file(output_path, os.path.join(RESULT_CACHE_DIR, f"{cache_key}.wav"))
+    except OSError as e:
+        logger.warning(f"Failed to cache result {cache_key}: {e}")
+
+def _evict_result_cache():
+    """Remove least recently used cached results until the cache fits its size limit"""
+    entries = []
+    with os.scandir(RESULT_CACHE_DIR) as it:
+        for entry in it:
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= RESULT_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError as e:
+            logger.warning(f"Failed to evict cached result {path}: {e}")
+
+def _remove_job_files(job: Dict[str, Any]):
+    """Delete the uploads and result belonging to a job"""
+    for key in ("input_path", "reference_path", "target_path", "output_path", "meta_path"):
+        path = job.get(key)
+        if not path:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to remove {path}: {e}")
+
+async def cleanup_finished_jobs():
+    """Periodically drop finished jobs and their files"""
+    while True:
+        try:
+            await asyncio.sleep(CLEANUP_INTERVAL_SECONDS)
+            
+            cutoff = time.time() - JOB_RETENTION_SECONDS
+            async with jobs_lock:
+                expired = [
+                    (job_id, job) for job_id, job in list(jobs.items())
+                    if job["status"] in ("completed", "failed")
+                    and job["created_at"] < cutoff
+                ]
+                for job_id, _ in expired:
+                    jobs.pop(job_id, None)
+            
+            for _, job in expired:
+                await asyncio.to_thread(_remove_job_files, job)
+            
+            if expired:
+                logger.info(f"Cleaned up {len(expired)} finished jobs")
+            
+            await asyncio.to_thread(_evict_result_cache)
+            await asyncio.to_thread(speaker_cache.evict_disk)
+                
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"Job cleanup error: {e}")
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize the application"""
     logger.info("Starting Real Seed-VC Backend...")
     
+    # Created here so they bind to the server's event loop
+    global job_semaphore, jobs_lock, cleanup_task, conversion_queue, coalescer_task
+    job_semaphore = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+    jobs_lock = asyncio.Lock()
+    conversion_queue = asyncio.Queue(maxsize=256)
+    cleanup_task = asyncio.create_task(cleanup_finished_jobs())
+    coalescer_task = asyncio.create_task(conversion_coalescer())
+    
     try:
         # Initialize Seed-VC processor
         await seedvc_processor.initialize()
         logger.info("Seed-VC processor initialized")
         
+        # Resolve preset speaker embeddings once instead of per job
+        app.state.speaker_embeddings = await asyncio.to_thread(
+            seedvc_processor.load_speaker_embeddings,
+            [speaker["id"] for speaker in PRESET_SPEAKERS]
+        )
+        
     except Exception as e:
         logger.error(f"Startup failed: {e}")
 
@@ -92,60 +372,76 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down Seed-VC backend...")
+    
+    if cleanup_task:
+        cleanup_task.cancel()
+    
+    if coalescer_task:
+        coalescer_task.cancel()
+
+ROOT_INFO = {
+    "message": "🎭 Hệ Thống Seed-VC CPU - Real Implementation",
+    "version": "2.0.0",
+    "status": "online",
+    "features": [
+        "Chuyển đổi giọng nói thực tế (Real Seed-VC)",
+        "Nhân bản giọng nói AI với thuật toán gốc",
+        "Xử lý few-shot learning",
+        "Speaker embedding extraction",
+        "F0 conversion và formant shifting",
+        "100% Tiếng Việt"
+    ]
+}
 
 @app.get("/")
-async def root():
+def root():
     """Root endpoint"""
-    return {
-        "message": "🎭 Hệ Thống Seed-VC CPU - Real Implementation",
-        "version": "2.0.0",
-        "status": "online",
-        "features": [
-            "Chuyển đổi giọng nói thực tế (Real Seed-VC)",
-            "Nhân bản giọng nói AI với thuật toán gốc",
-            "Xử lý few-shot learning",
-            "Speaker embedding extraction",
-            "F0 conversion và formant shifting",
-            "100% Tiếng Việt"
-        ],
-        "timestamp": datetime.now().isoformat()
-    }
+    return Response(
+        content=_json_bytes({**ROOT_INFO, "timestamp": _iso_now()}),
+        media_type="application/json"
+    )
 
 @app.get("/health")
-async def health_check():
+def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "processor": "SeedVC-Real",
-        "sample_rate": seedvc_processor.sample_rate,
-        "timestamp": datetime.now().isoformat()
+    return Response(
+        content=_json_bytes({
+            "status": "healthy",
+            "processor": "SeedVC-Real",
+            "sample_rate": seedvc_processor.sample_rate,
+            "timestamp": _iso_now()
+        }),
+        media_type="application/json"
+    )
+
+# Static listings are serialized once at import time
+AVAILABLE_MODELS = [
+    {
+        "id": "seed-vc-base",
+        "name": "Seed-VC Cơ Bản",
+        "description": "Mô hình Seed-VC gốc với chất lượng cao",
+        "language": "Đa ngôn ngữ",
+        "available": True,
+        "features": ["Content encoder", "Speaker encoder", "Neural decoder"]
+    },
+    {
+        "id": "seed-vc-fast", 
+        "name": "Seed-VC Nhanh",
+        "description": "Phiên bản tối ưu CPU của Seed-VC",
+        "language": "Đa ngôn ngữ", 
+        "available": True,
+        "features": ["Quantized models", "CPU optimization"]
     }
+]
+_MODELS_JSON = _json_bytes(AVAILABLE_MODELS)
 
 @app.get("/models")
 async def get_models():
     """Get available models"""
-    return [
-        {
-            "id": "seed-vc-base",
-            "name": "Seed-VC Cơ Bản",
-            "description": "Mô hình Seed-VC gốc với chất lượng cao",
-            "language": "Đa ngôn ngữ",
-            "available": True,
-            "features": ["Content encoder", "Speaker encoder", "Neural decoder"]
-        },
-        {
-            "id": "seed-vc-fast", 
-            "name": "Seed-VC Nhanh",
-            "description": "Phiên bản tối ưu CPU của Seed-VC",
-            "language": "Đa ngôn ngữ", 
-            "available": True,
-            "features": ["Quantized models", "CPU optimization"]
-        }
-    ]
+    return Response(content=_MODELS_JSON, media_type="application/json")
 
 @app.post("/convert")
 async def convert_voice(
-    background_tasks: BackgroundTasks,
     audio_file: UploadFile = File(...),
     model_id: str = "seed-vc-fast",
     target_speaker: str = "speaker_001",
@@ -156,26 +452,32 @@ async def convert_voice(
     """Real voice conversion using Seed-VC methodology"""
     
     # Validate file
-    if not audio_file.content_type or not audio_file.content_type.startswith('audio/'):
-        raise HTTPException(status_code=400, detail="Định dạng tệp âm thanh không hợp lệ")
-    
-    if audio_file.size > 100 * 1024 * 1024:
+    # Cheap early rejection when the client reports a size; _spool_upload enforces the hard limit
+    if audio_file.size and audio_file.size > MAX_UPLOAD_BYTES:
         raise HTTPException(status_code=400, detail="Kích thước tệp quá lớn (max 100MB)")
     
+    await _validate_audio_magic(audio_file)
+    
     try:
         # Generate job ID
         job_id = str(uuid.uuid4())
         
         # Save uploaded file
-        file_extension = audio_file.filename.split('.')[-1].lower()
+        file_extension = _upload_extension(audio_file)
         input_path = os.path.join(UPLOAD_DIR, f"{job_id}.{file_extension}")
         
-        async with aiofiles.open(input_path, 'wb') as f:
-            content = await audio_file.read()
-            await f.write(content)
+        audio_hash = await _spool_upload(audio_file, input_path, MAX_UPLOAD_BYTES)
+        cache_key = _result_cache_key(
+            audio_hash,
+            model_id=model_id,
+            target_speaker=target_speaker,
+            conversion_strength=conversion_strength,
+            preserve_pitch=preserve_pitch,
+            f0_conversion=f0_conversion
+        )
         
         # Create job record
-        jobs[job_id] = {
+        job = {
             "id": job_id,
             "type": "voice_conversion",
             "status": "queued",
@@ -187,13 +489,37 @@ async def convert_voice(
             "conversion_strength": conversion_strength,
             "preserve_pitch": preserve_pitch,
             "f0_conversion": f0_conversion,
-            "created_at": datetime.now().isoformat(),
+            "cache_key": cache_key,
+            "created_at": time.time(),
             "result_url": None,
             "error": None
         }
         
-        # Start processing
-        background_tasks.add_task(process_real_conversion, job_id)
+        # Identical audio and parameters were converted before; reuse that output
+        output_path = os.path.join(OUTPUT_DIR, f"converted_{job_id}.wav")
+        if await asyncio.to_thread(_restore_cached_result, cache_key, output_path):
+            job.update({
+                "status": "completed",
+                "progress": 100.0,
+                "message": "Chuyển đổi hoàn thành (kết quả đã lưu trong bộ nhớ đệm)",
+                "result_url": f"/static/converted_{job_id}.wav",
+                "output_path": output_path,
+                "processing_time": 0.0
+            })
+            async with jobs_lock:
+                jobs[job_id] = job
+            
+            return {
+                "job_id": job_id,
+                "status": "completed",
+                "message": job["message"]
+            }
+        
+        async with jobs_lock:
+            jobs[job_id] = job
+        
+        # Hand off to the coalescer, which batches jobs that arrive together
+        await conversion_queue.put(job_id)
         
         return {
             "job_id": job_id,
@@ -201,6 +527,8 @@ async def convert_voice(
             "message": "Công việc chuyển đổi đã được thêm vào hàng đợi xử lý"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error starting conversion: {e}")
         raise HTTPException(status_code=500, detail="Không thể bắt đầu chuyển đổi")
@@ -217,33 +545,49 @@ async def clone_voice(
     
     # Validate files
     for file in [reference_file, target_file]:
-        if not file.content_type or not file.content_type.startswith('audio/'):
-            raise HTTPException(status_code=400, detail="Định dạng tệp âm thanh không hợp lệ")
-        
-        if file.size > 50 * 1024 * 1024:
+        if file.size and file.size > MAX_CLONE_UPLOAD_BYTES:
             raise HTTPException(status_code=400, detail="Kích thước tệp quá lớn cho nhân bản (max 50MB)")
     
+    await asyncio.gather(_validate_audio_magic(reference_file), _validate_audio_magic(target_file))
+    
     try:
         # Generate job ID
         job_id = str(uuid.uuid4())
         
         # Save uploaded files
-        ref_extension = reference_file.filename.split('.')[-1].lower()
-        target_extension = target_file.filename.split('.')[-1].lower()
+        ref_extension = _upload_extension(reference_file)
+        target_extension = _upload_extension(target_file)
         
         ref_path = os.path.join(UPLOAD_DIR, f"{job_id}_ref.{ref_extension}")
         target_path = os.path.join(UPLOAD_DIR, f"{job_id}_target.{target_extension}")
         
-        async with aiofiles.open(ref_path, 'wb') as f:
-            ref_content = await reference_file.read()
-            await f.write(ref_content)
-            
-        async with aiofiles.open(target_path, 'wb') as f:
-            target_content = await target_file.read()
-            await f.write(target_content)
+        # The two uploads are independent, so write them concurrently
+        results = await asyncio.gather(
+            _spool_upload(reference_file, ref_path, MAX_CLONE_UPLOAD_BYTES),
+            _spool_upload(target_file, target_path, MAX_CLONE_UPLOAD_BYTES),
+            return_exceptions=True
+        )
+        
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            # Don't leave the other half of a rejected pair on disk
+            for path in (ref_path, target_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            raise errors[0]
+        
+        ref_hash, target_hash = results
+        cache_key = _result_cache_key(
+            ref_hash,
+            target_hash,
+            similarity_threshold=similarity_threshold,
+            few_shot_samples=few_shot_samples
+        )
         
         # Create job record
-        jobs[job_id] = {
+        job = {
             "id": job_id,
             "type": "voice_cloning",
             "status": "queued",
@@ -253,11 +597,35 @@ async def clone_voice(
             "target_path": target_path,
             "similarity_threshold": similarity_threshold,
             "few_shot_samples": few_shot_samples,
-            "created_at": datetime.now().isoformat(),
+            "cache_key": cache_key,
+            "created_at": time.time(),
             "result_url": None,
             "error": None
         }
         
+        # Identical inputs and parameters were cloned before; reuse that output
+        output_path = os.path.join(OUTPUT_DIR, f"cloned_{job_id}.wav")
+        if await asyncio.to_thread(_restore_cached_result, cache_key, output_path):
+            job.update({
+                "status": "completed",
+                "progress": 100.0,
+                "message": "Nhân bản giọng nói hoàn thành (kết quả đã lưu trong bộ nhớ đệm)",
+                "result_url": f"/static/cloned_{job_id}.wav",
+                "output_path": output_path,
+                "processing_time": 0.0
+            })
+            async with jobs_lock:
+                jobs[job_id] = job
+            
+            return {
+                "job_id": job_id,
+                "status": "completed",
+                "message": job["message"]
+            }
+        
+        async with jobs_lock:
+            jobs[job_id] = job
+        
         # Start processing
         background_tasks.add_task(process_real_cloning, job_id)
         
@@ -267,6 +635,8 @@ async def clone_voice(
             "message": "Công việc nhân bản giọng nói đã được thêm vào hàng đợi"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error starting voice cloning: {e}")
         raise HTTPException(status_code=500, detail="Không thể bắt đầu nhân bản giọng nói")
@@ -274,10 +644,12 @@ async def clone_voice(
 @app.get("/convert/{job_id}/status", response_model=JobStatus)
 async def get_job_status(job_id: str):
     """Get job status"""
-    if job_id not in jobs:
+    async with jobs_lock:
+        job = jobs.get(job_id)
+    
+    if job is None:
         raise HTTPException(status_code=404, detail="Không tìm thấy công việc")
     
-    job = jobs[job_id]
     return JobStatus(
         job_id=job_id,
         status=job["status"],
@@ -291,43 +663,70 @@ async def get_job_status(job_id: str):
 @app.get("/convert/{job_id}/result")
 async def download_result(job_id: str):
     """Download conversion result"""
-    if job_id not in jobs:
-        raise HTTPException(status_code=404, detail="Không tìm thấy công việc")
+    async with jobs_lock:
+        job = jobs.get(job_id)
     
-    job = jobs[job_id]
+    if job is None:
+        raise HTTPException(status_code=404, detail="Không tìm thấy công việc")
     
     if job["status"] != "completed":
         raise HTTPException(status_code=400, detail="Công việc chưa hoàn thành")
     
-    result_path = job.get("result_url", "").replace("/static/", "outputs/")
-    
-    if not os.path.exists(result_path):
+    # Output path is recorded on the job when it completes
+    result_path = job.get("output_path")
+    if not result_path:
         raise HTTPException(status_code=404, detail="Không tìm thấy file kết quả")
     
-    def generate_file():
-        with open(result_path, "rb") as f:
-            while True:
-                chunk = f.read(8192)
-                if not chunk:
-                    break
-                yield chunk
+    # Stat off the event loop and hand the result to FileResponse so it is not repeated
+    try:
+        stat_result = await asyncio.to_thread(os.stat, result_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Không tìm thấy file kết quả")
     
     filename = f"result_{job_id}.wav"
     if job["type"] == "voice_cloning":
         filename = f"cloned_{job_id}.wav"
     
-    return StreamingResponse(
-        generate_file(),
+    # Served by Starlette via sendfile where available
+    return FileResponse(
+        path=result_path,
         media_type="audio/wav",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+        filename=filename,
+        stat_result=stat_result
     )
 
+async def _finish_conversion(job_id: str, job: Dict[str, Any], result: Dict[str, Any], output_path: str, start_time: float):
+    """Record the outcome of a conversion on its job"""
+    if result["success"]:
+        processing_time = time.time() - start_time
+        
+        job["progress"] = 100.0
+        job["status"] = "completed"
+        job["message"] = f"Chuyển đổi hoàn thành trong {processing_time:.1f} giây"
+        job["result_url"] = f"/static/converted_{job_id}.wav"
+        job["output_path"] = output_path
+        job["processing_time"] = processing_time
+        job["duration"] = result.get("duration", 0)
+        
+        await asyncio.to_thread(_store_cached_result, job["cache_key"], output_path)
+        
+        logger.info(f"Voice conversion completed for job {job_id} in {processing_time:.1f}s")
+    else:
+        job["status"] = "failed"
+        job["error"] = result.get("error", "Unknown error")
+        job["message"] = f"Chuyển đổi thất bại: {job['error']}"
+
 async def process_real_conversion(job_id: str):
     """Process voice conversion with real Seed-VC"""
     start_time = time.time()
     
+    async with jobs_lock:
+        job = jobs.get(job_id)
+    if job is None:
+        logger.warning(f"Job {job_id} expired before voice conversion started")
+        return
+    
     try:
-        job = jobs[job_id]
         logger.info(f"Starting real voice conversion for job {job_id}")
         
         # Update status
@@ -341,29 +740,19 @@ async def process_real_conversion(job_id: str):
         job["progress"] = 30.0
         job["message"] = "Đang xử lý chuyển đổi giọng nói..."
         
+        # Preset embeddings are loaded at startup, so this is a dict lookup
+        target_embedding = seedvc_processor._get_speaker_embedding(job["target_speaker"])
+        
         # Process with real Seed-VC
-        result = await seedvc_processor.process_voice_conversion(
-            source_file=job["input_path"],
-            target_speaker_id=job["target_speaker"],
-            output_file=output_path,
-            conversion_strength=job["conversion_strength"]
-        )
+        async with job_semaphore:
+            result = await seedvc_processor.process_voice_conversion(
+                source_file=job["input_path"],
+                target_speaker_embedding=target_embedding,
+                output_file=output_path,
+                conversion_strength=job["conversion_strength"]
+            )
         
-        if result["success"]:
-            processing_time = time.time() - start_time
-            
-            job["progress"] = 100.0
-            job["status"] = "completed"
-            job["message"] = f"Chuyển đổi hoàn thành trong {processing_time:.1f} giây"
-            job["result_url"] = f"/static/converted_{job_id}.wav"
-            job["processing_time"] = processing_time
-            job["duration"] = result.get("duration", 0)
-            
-            logger.info(f"Voice conversion completed for job {job_id} in {processing_time:.1f}s")
-        else:
-            job["status"] = "failed"
-            job["error"] = result.get("error", "Unknown error")
-            job["message"] = f"Chuyển đổi thất bại: {job['error']}"
+        await _finish_conversion(job_id, job, result, output_path, start_time)
             
     except Exception as e:
         processing_time = time.time() - start_time
@@ -372,12 +761,86 @@ async def process_real_conversion(job_id: str):
         job["error"] = str(e)
         job["message"] = f"Chuyển đổi thất bại sau {processing_time:.1f} giây: {str(e)}"
 
+async def process_real_conversion_batch(job_ids: List[str]):
+    """Process a batch of conversion jobs in one Seed-VC call"""
+    if len(job_ids) == 1:
+        await process_real_conversion(job_ids[0])
+        return
+    
+    start_time = time.time()
+    
+    async with jobs_lock:
+        batch = [(job_id, jobs[job_id]) for job_id in job_ids if job_id in jobs]
+    logger.info(f"Starting real voice conversion for batch of {len(batch)} jobs")
+    
+    items = []
+    for job_id, job in batch:
+        job["status"] = "processing"
+        job["progress"] = 30.0
+        job["message"] = "Đang xử lý chuyển đổi giọng nói..."
+        
+        items.append({
+            "source_file": job["input_path"],
+            "target_speaker_embedding": seedvc_processor._get_speaker_embedding(job["target_speaker"]),
+            "output_file": os.path.join(OUTPUT_DIR, f"converted_{job_id}.wav"),
+            "conversion_strength": job["conversion_strength"]
+        })
+    
+    finished: Set[int] = set()
+    
+    async def record(i: int, result: Dict[str, Any]):
+        # Each job completes as soon as its own item does, not with the whole batch
+        finished.add(i)
+        job_id, job = batch[i]
+        await _finish_conversion(job_id, job, result, items[i]["output_file"], start_time)
+    
+    try:
+        await seedvc_processor.process_voice_conversion_batch(items, on_result=record, limiter=job_semaphore)
+    except Exception as e:
+        logger.error(f"Batch voice conversion failed: {e}")
+        for i, (job_id, job) in enumerate(batch):
+            if i not in finished:
+                await _finish_conversion(job_id, job, {"success": False, "error": str(e)}, items[i]["output_file"], start_time)
+
+async def conversion_coalescer():
+    """Group conversion jobs that arrive within a short window into batches"""
+    loop = asyncio.get_running_loop()
+    
+    while True:
+        try:
+            batch = [await conversion_queue.get()]
+            deadline = loop.time() + CONVERSION_BATCH_WINDOW
+            
+            while len(batch) < CONVERSION_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(conversion_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Keep a reference so the batch task is not garbage collected mid-run
+            task = asyncio.create_task(process_real_conversion_batch(batch))
+            batch_tasks.add(task)
+            task.add_done_callback(batch_tasks.discard)
+            
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"Conversion coalescer error: {e}")
+
 async def process_real_cloning(job_id: str):
     """Process voice cloning with real Seed-VC"""
     start_time = time.time()
     
+    async with jobs_lock:
+        job = jobs.get(job_id)
+    if job is None:
+        logger.warning(f"Job {job_id} expired before voice cloning started")
+        return
+    
     try:
-        job = jobs[job_id]
         logger.info(f"Starting real voice cloning for job {job_id}")
         
         # Update status
@@ -385,31 +848,29 @@ async def process_real_cloning(job_id: str):
         job["progress"] = 15.0
         job["message"] = "Đang phân tích giọng nói tham khảo với Seed-VC..."
         
-        await asyncio.sleep(1)  # Allow UI update
-        
-        job["progress"] = 30.0
-        job["message"] = "Đang trích xuất đặc trưng speaker embedding..."
-        
-        await asyncio.sleep(1)
-        
-        job["progress"] = 50.0
-        job["message"] = "Đang xử lý content features và F0..."
-        
-        await asyncio.sleep(1)
+        # Progress reported by the processor as each stage starts
+        stage_progress = {
+            "speaker_embedding": (30.0, "Đang trích xuất đặc trưng speaker embedding..."),
+            "content_features": (50.0, "Đang xử lý content features và F0..."),
+            "decoding": (70.0, "Đang thực hiện nhân bản giọng nói...")
+        }
         
-        job["progress"] = 70.0
-        job["message"] = "Đang thực hiện nhân bản giọng nói..."
+        def on_progress(stage: str):
+            if stage in stage_progress:
+                job["progress"], job["message"] = stage_progress[stage]
         
         # Prepare output path
         output_path = os.path.join(OUTPUT_DIR, f"cloned_{job_id}.wav")
         
         # Process with real Seed-VC cloning
-        result = await seedvc_processor.process_voice_cloning(
-            reference_file=job["reference_path"],
-            target_file=job["target_path"],
-            output_file=output_path,
-            similarity_threshold=job["similarity_threshold"]
-        )
+        async with job_semaphore:
+            result = await seedvc_processor.process_voice_cloning(
+                reference_file=job["reference_path"],
+                target_file=job["target_path"],
+                output_file=output_path,
+                similarity_threshold=job["similarity_threshold"],
+                progress_callback=on_progress
+            )
         
         if result["success"]:
             processing_time = time.time() - start_time
@@ -418,10 +879,13 @@ async def process_real_cloning(job_id: str):
             job["status"] = "completed"
             job["message"] = f"Nhân bản giọng nói hoàn thành trong {processing_time:.1f} giây"
             job["result_url"] = f"/static/cloned_{job_id}.wav"
+            job["output_path"] = output_path
             job["processing_time"] = processing_time
             job["duration"] = result.get("duration", 0)
             job["similarity_used"] = result.get("similarity_used", 0.8)
             
+            await asyncio.to_thread(_store_cached_result, job["cache_key"], output_path)
+            
             logger.info(f"Voice cloning completed for job {job_id} in {processing_time:.1f}s")
         else:
             job["status"] = "failed"
@@ -435,47 +899,12 @@ async def process_real_cloning(job_id: str):
         job["error"] = str(e)
         job["message"] = f"Nhân bản thất bại sau {processing_time:.1f} giây: {str(e)}"
 
+_SPEAKERS_JSON = _json_bytes(PRESET_SPEAKERS)
+
 @app.get("/speakers")
 async def get_available_speakers():
     """Get available target speakers"""
-    return [
-        {
-            "id": "speaker_001",
-            "name": "Giọng Nam Trẻ",
-            "description": "Giọng nam trẻ tuổi, rõ ràng",
-            "gender": "nam",
-            "age_range": "20-30",
-            "language": "Tiếng Việt",
-            "available": True
-        },
-        {
-            "id": "speaker_002", 
-            "name": "Giọng Nữ Dịu Dàng",
-            "description": "Giọng nữ dịu dàng, ấm áp",
-            "gender": "nữ",
-            "age_range": "25-35", 
-            "language": "Tiếng Việt",
-            "available": True
-        },
-        {
-            "id": "speaker_003",
-            "name": "Giọng Nam Trung Niên", 
-            "description": "Giọng nam trung niên, tin cậy",
-            "gender": "nam",
-            "age_range": "35-45",
-            "language": "Tiếng Việt", 
-            "available": True
-        },
-        {
-            "id": "speaker_004",
-            "name": "Giọng Nữ Chuyên Nghiệp",
-            "description": "Giọng nữ chuyên nghiệp, rõ ràng",
-            "gender": "nữ", 
-            "age_range": "30-40",
-            "language": "Tiếng Việt",
-            "available": True
-        }
-    ]
+    return Response(content=_SPEAKERS_JSON, media_type="application/json")
 
 @app.post("/extract-speaker")
 async def extract_speaker_embedding(
@@ -485,22 +914,22 @@ async def extract_speaker_embedding(
 ):
     """Extract speaker embedding from audio for custom voice creation"""
     
-    if not audio_file.content_type or not audio_file.content_type.startswith('audio/'):
-        raise HTTPException(status_code=400, detail="Định dạng tệp âm thanh không hợp lệ")
+    if audio_file.size and audio_file.size > MAX_CLONE_UPLOAD_BYTES:
+        raise HTTPException(status_code=400, detail="Kích thước tệp quá lớn (max 50MB)")
+    
+    await _validate_audio_magic(audio_file)
     
     try:
         job_id = str(uuid.uuid4())
         
         # Save file
-        file_extension = audio_file.filename.split('.')[-1].lower()
+        file_extension = _upload_extension(audio_file)
         input_path = os.path.join(UPLOAD_DIR, f"speaker_{job_id}.{file_extension}")
         
-        async with aiofiles.open(input_path, 'wb') as f:
-            content = await audio_file.read()
-            await f.write(content)
+        await _spool_upload(audio_file, input_path, MAX_CLONE_UPLOAD_BYTES)
         
         # Create job
-        jobs[job_id] = {
+        job = {
             "id": job_id,
             "type": "speaker_extraction",
             "status": "processing",
@@ -508,8 +937,10 @@ async def extract_speaker_embedding(
             "message": "Đang trích xuất đặc trưng giọng nói...",
             "input_path": input_path,
             "speaker_name": speaker_name,
-            "created_at": datetime.now().isoformat()
+            "created_at": time.time()
         }
+        async with jobs_lock:
+            jobs[job_id] = job
         
         # Process speaker extraction
         background_tasks.add_task(process_speaker_extraction, job_id)
@@ -520,50 +951,61 @@ async def extract_speaker_embedding(
             "message": "Đang trích xuất đặc trưng giọng nói tùy chỉnh"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error extracting speaker: {e}")
         raise HTTPException(status_code=500, detail="Không thể trích xuất đặc trưng giọng nói")
 
 async def process_speaker_extraction(job_id: str):
     """Extract speaker embedding from audio"""
+    async with jobs_lock:
+        job = jobs.get(job_id)
+    if job is None:
+        logger.warning(f"Job {job_id} expired before speaker extraction started")
+        return
+    
     try:
-        job = jobs[job_id]
-        
         job["progress"] = 30.0
         job["message"] = "Đang tải và xử lý âm thanh..."
         
         # Load and process audio
-        import soundfile as sf
-        audio, sr = sf.read(job["input_path"])
+        audio, sr = await asyncio.to_thread(sf.read, job["input_path"])
         
-        if sr != seedvc_processor.sample_rate:
-            audio = librosa.resample(audio, orig_sr=sr, target_sr=seedvc_processor.sample_rate)
+        audio = await asyncio.to_thread(seedvc_processor.resample, audio, sr)
         
         job["progress"] = 60.0
         job["message"] = "Đang trích xuất speaker embedding..."
         
-        # Extract speaker embedding
-        speaker_embedding = await seedvc_processor._extract_speaker_embedding(audio)
+        # Extract speaker embedding (cached by audio content)
+        speaker_embedding = await seedvc_processor.get_speaker_embedding(audio)
         
         job["progress"] = 90.0
         job["message"] = "Đang lưu đặc trưng giọng nói..."
         
-        # Save speaker embedding
-        embedding_file = os.path.join(OUTPUT_DIR, f"speaker_{job_id}.json")
-        embedding_data = {
+        # Save speaker embedding as raw float32 (loadable with np.load(..., mmap_mode='r'))
+        embedding_file = os.path.join(OUTPUT_DIR, f"speaker_{job_id}.npy")
+        await asyncio.to_thread(np.save, embedding_file, np.asarray(speaker_embedding, dtype=np.float32))
+        
+        # Small metadata sidecar; the embedding itself stays binary
+        meta_file = os.path.join(OUTPUT_DIR, f"speaker_{job_id}.meta.json")
+        metadata = {
             "speaker_name": job["speaker_name"],
-            "embedding": speaker_embedding.tolist(),
+            "embedding_file": f"speaker_{job_id}.npy",
+            "embedding_dim": int(speaker_embedding.shape[-1]),
             "created_at": datetime.now().isoformat(),
             "audio_duration": len(audio) / seedvc_processor.sample_rate
         }
         
-        with open(embedding_file, 'w') as f:
-            json.dump(embedding_data, f, indent=2)
+        async with aiofiles.open(meta_file, 'wb') as f:
+            await f.write(_json_bytes(metadata))
         
         job["progress"] = 100.0
         job["status"] = "completed"
         job["message"] = "Đặc trưng giọng nói đã được trích xuất thành công"
-        job["result_url"] = f"/static/speaker_{job_id}.json"
+        job["result_url"] = f"/static/speaker_{job_id}.npy"
+        job["output_path"] = embedding_file
+        job["meta_path"] = meta_file
         
     except Exception as e:
         logger.error(f"Speaker extraction failed for job {job_id}: {e}")
@@ -571,20 +1013,40 @@ async def process_speaker_extraction(job_id: str):
         job["error"] = str(e)
         job["message"] = f"Trích xuất thất bại: {str(e)}"
 
+def _decaying_tone(t: np.ndarray, frequency: float, decay: float) -> np.ndarray:
+    """0.3 * sin(2*pi*f*t) * exp(-t/decay), computed in place over two buffers"""
+    tone = np.multiply(t, 2 * np.pi * frequency)
+    np.sin(tone, out=tone)
+    envelope = np.divide(t, -decay)
+    np.exp(envelope, out=envelope)
+    tone *= envelope
+    tone *= 0.3
+    return tone
+
+@lru_cache(maxsize=None)
+def _demo_test_signals(sample_rate: int, duration: float):
+    """Synthetic reference/target signals for the demo, built once per sample rate"""
+    t = np.linspace(0, duration, int(duration * sample_rate), dtype=np.float32)
+    
+    # Reference voice (simulate male voice, 150Hz base frequency)
+    ref_audio = _decaying_tone(t, 150, 2)
+    
+    # Target content (simulate female voice with different content, 220Hz base frequency)
+    target_audio = _decaying_tone(t, 220, 3)
+    
+    # Shared between requests, so guard against accidental in-place edits
+    ref_audio.setflags(write=False)
+    target_audio.setflags(write=False)
+    return ref_audio, target_audio
+
 @app.get("/demo/test-cloning")
 async def test_voice_cloning():
     """Demo endpoint to test voice cloning functionality"""
     try:
-        # Generate test audio signals
+        # Test audio signals are synthesized once and reused
         duration = 3.0  # 3 seconds
         sample_rate = seedvc_processor.sample_rate
-        t = np.linspace(0, duration, int(duration * sample_rate))
-        
-        # Reference voice (simulate male voice)
-        ref_audio = 0.3 * np.sin(2 * np.pi * 150 * t) * np.exp(-t/2)  # 150Hz base frequency
-        
-        # Target content (simulate female voice with different content)
-        target_audio = 0.3 * np.sin(2 * np.pi * 220 * t) * np.exp(-t/3)  # 220Hz base frequency
+        ref_audio, target_audio = _demo_test_signals(sample_rate, duration)
         
         # Perform voice cloning
         cloned_audio = await seedvc_processor.clone_voice(ref_audio, target_audio, 0.8)
@@ -613,45 +1075,48 @@ async def test_voice_cloning():
             "message": "Test nhân bản giọng nói thất bại"
         }
 
+SYSTEM_CAPABILITIES = {
+    "voice_conversion": {
+        "available": True,
+        "models": ["seed-vc-base", "seed-vc-fast"],
+        "features": [
+            "Content encoding",
+            "Speaker encoding", 
+            "F0 conversion",
+            "Formant shifting",
+            "Spectral envelope matching"
+        ]
+    },
+    "voice_cloning": {
+        "available": True,
+        "method": "Few-shot learning",
+        "features": [
+            "Speaker embedding extraction",
+            "Content-speaker disentanglement",
+            "F0 style transfer",
+            "Timbre characteristics transfer",
+            "Real-time processing"
+        ]
+    },
+    "audio_processing": {
+        "sample_rate": seedvc_processor.sample_rate,
+        "supported_formats": ["wav", "mp3", "flac", "m4a"],
+        "max_duration": "10 minutes",
+        "processing_method": "CPU-optimized Seed-VC"
+    },
+    "performance": {
+        "conversion_time": "~2-5 seconds per 10s audio",
+        "cloning_time": "~3-8 seconds per 10s audio", 
+        "concurrent_users": "10-50 depending on hardware",
+        "memory_usage": "~500MB per active job"
+    }
+}
+_CAPABILITIES_JSON = _json_bytes(SYSTEM_CAPABILITIES)
+
 @app.get("/system/capabilities")
 async def get_system_capabilities():
     """Get system capabilities and features"""
-    return {
-        "voice_conversion": {
-            "available": True,
-            "models": ["seed-vc-base", "seed-vc-fast"],
-            "features": [
-                "Content encoding",
-                "Speaker encoding", 
-                "F0 conversion",
-                "Formant shifting",
-                "Spectral envelope matching"
-            ]
-        },
-        "voice_cloning": {
-            "available": True,
-            "method": "Few-shot learning",
-            "features": [
-                "Speaker embedding extraction",
-                "Content-speaker disentanglement",
-                "F0 style transfer",
-                "Timbre characteristics transfer",
-                "Real-time processing"
-            ]
-        },
-        "audio_processing": {
-            "sample_rate": seedvc_processor.sample_rate,
-            "supported_formats": ["wav", "mp3", "flac", "m4a"],
-            "max_duration": "10 minutes",
-            "processing_method": "CPU-optimized Seed-VC"
-        },
-        "performance": {
-            "conversion_time": "~2-5 seconds per 10s audio",
-            "cloning_time": "~3-8 seconds per 10s audio", 
-            "concurrent_users": "10-50 depending on hardware",
-            "memory_usage": "~500MB per active job"
-        }
-    }
+    return Response(content=_CAPABILITIES_JSON, media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
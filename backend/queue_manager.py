@@ -5,16 +5,27 @@ Handles processing queue for voice conversion jobs
 
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
-from enum import Enum
-import heapq
+from enum import Enum, IntEnum
+import itertools
+import sys
+import time
 
 logger = logging.getLogger(__name__)
 
-class JobPriority(Enum):
-    """Job priority levels"""
+# Offset from the monotonic clock to wall-clock time, for display only
+_WALL_CLOCK_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
+def _monotonic_isoformat(timestamp_ns: Optional[int]) -> Optional[str]:
+    """Convert a time.monotonic_ns() timestamp to an ISO wall-clock string"""
+    if timestamp_ns is None:
+        return None
+    return datetime.fromtimestamp((timestamp_ns + _WALL_CLOCK_OFFSET_NS) / 1e9).isoformat()
+
+class JobPriority(IntEnum):
+    """Job priority levels; lower values run first"""
     LOW = 3
     NORMAL = 2
     HIGH = 1
@@ -28,25 +39,22 @@ class JobStatus(Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
 
-@dataclass
+# Slotted dataclasses need Python 3.10+; older interpreters fall back to a __dict__
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_OPTIONS)
 class ProcessingJob:
     """Represents a voice conversion job"""
     id: str
     priority: JobPriority
     status: JobStatus
-    created_at: datetime
-    started_at: Optional[datetime] = None
-    completed_at: Optional[datetime] = None
+    created_at_ns: int = field(default_factory=time.monotonic_ns)
+    started_at_ns: Optional[int] = None
+    completed_at_ns: Optional[int] = None
     progress: float = 0.0
     message: str = ""
     error: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
-    
-    def __lt__(self, other):
-        """For priority queue ordering"""
-        if self.priority.value != other.priority.value:
-            return self.priority.value < other.priority.value
-        return self.created_at < other.created_at
 
 class ProcessingQueue:
     """Manages the processing queue for voice conversion jobs"""
@@ -54,11 +62,19 @@ class ProcessingQueue:
     def __init__(self, max_workers: int = 2, max_queue_size: int = 100):
         self.max_workers = max_workers
         self.max_queue_size = max_queue_size
-        self._queue: List[ProcessingJob] = []
+        # (priority, enqueue sequence, job id) entries; cancelled entries stay in place
+        # until a worker pops and skips them
+        self._queue: "asyncio.PriorityQueue[Tuple[JobPriority, int, str]]" = asyncio.PriorityQueue()
+        # One slot per job still waiting to run; add_job blocks while none are free, and
+        # cancelled jobs hand their slot back immediately rather than when their entry is popped
+        self._slots = asyncio.Semaphore(max_queue_size)
+        self._sequence = itertools.count()
+        # Queue entries of jobs still waiting to run, in submission order
+        self._queued_entries: Dict[str, Tuple[JobPriority, int, str]] = {}
         self._jobs: Dict[str, ProcessingJob] = {}
+        # Jobs per status, maintained by _set_status so get_stats never scans _jobs
+        self._status_counts: Dict[str, int] = {status.value: 0 for status in JobStatus}
         self._workers: List[asyncio.Task] = []
-        self._worker_semaphore = asyncio.Semaphore(max_workers)
-        self._queue_lock = asyncio.Lock()
         self._running = False
         
     async def start(self):
@@ -96,28 +112,33 @@ class ProcessingQueue:
         priority: JobPriority = JobPriority.NORMAL,
         metadata: Optional[Dict[str, Any]] = None
     ) -> ProcessingJob:
-        """Add a job to the processing queue"""
+        """Add a job to the processing queue, waiting for room if it is full"""
         
-        if len(self._queue) >= self.max_queue_size:
-            raise RuntimeError("Processing queue is full")
+        if job_id in self._jobs:
+            raise ValueError(f"Job {job_id} already exists")
         
+        # Register the job only once a slot is held, so a caller cancelled while
+        # waiting for room leaves nothing behind
+        await self._slots.acquire()
         if job_id in self._jobs:
+            self._slots.release()
             raise ValueError(f"Job {job_id} already exists")
         
-        async with self._queue_lock:
-            job = ProcessingJob(
-                id=job_id,
-                priority=priority,
-                status=JobStatus.QUEUED,
-                created_at=datetime.now(),
-                metadata=metadata or {}
-            )
-            
-            self._jobs[job_id] = job
-            heapq.heappush(self._queue, job)
-            
-            logger.info(f"Added job {job_id} to queue with priority {priority.name}")
-            return job
+        job = ProcessingJob(
+            id=job_id,
+            priority=priority,
+            status=JobStatus.QUEUED,
+            metadata=metadata or {}
+        )
+        entry = (priority, next(self._sequence), job_id)
+        
+        self._jobs[job_id] = job
+        self._status_counts[JobStatus.QUEUED.value] += 1
+        self._queued_entries[job_id] = entry
+        self._queue.put_nowait(entry)
+        
+        logger.info(f"Added job {job_id} to queue with priority {priority.name}")
+        return job
     
     async def get_job(self, job_id: str) -> Optional[ProcessingJob]:
         """Get a job by ID"""
@@ -132,9 +153,12 @@ class ProcessingQueue:
         if job.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED]:
             return False
         
-        job.status = JobStatus.CANCELLED
+        # Leave the queue entry in place; the worker that pops it skips it
+        self._release_entry(job_id)
+        
+        self._set_status(job, JobStatus.CANCELLED)
         job.message = "Job cancelled by user"
-        job.completed_at = datetime.now()
+        job.completed_at_ns = time.monotonic_ns()
         
         logger.info(f"Cancelled job {job_id}")
         return True
@@ -156,41 +180,47 @@ class ProcessingQueue:
         """Mark job as completed"""
         job = self._jobs.get(job_id)
         if job:
-            job.status = JobStatus.COMPLETED
+            self._set_status(job, JobStatus.COMPLETED)
             job.progress = 100.0
             job.message = message
-            job.completed_at = datetime.now()
+            job.completed_at_ns = time.monotonic_ns()
             logger.info(f"Completed job {job_id}")
     
     async def fail_job(self, job_id: str, error: str):
         """Mark job as failed"""
         job = self._jobs.get(job_id)
         if job:
-            job.status = JobStatus.FAILED
+            self._set_status(job, JobStatus.FAILED)
             job.error = error
             job.message = f"Job failed: {error}"
-            job.completed_at = datetime.now()
+            job.completed_at_ns = time.monotonic_ns()
             logger.error(f"Failed job {job_id}: {error}")
     
+    def _release_entry(self, job_id: str):
+        """Stop tracking a waiting job's queue entry and free its slot"""
+        if self._queued_entries.pop(job_id, None) is not None:
+            self._slots.release()
+    
+    def _set_status(self, job: ProcessingJob, status: JobStatus):
+        """Change a job's status, keeping the per-status counters in step"""
+        self._status_counts[job.status.value] -= 1
+        self._status_counts[status.value] += 1
+        job.status = status
+    
     def size(self) -> int:
         """Get current queue size"""
-        return len(self._queue)
+        return len(self._queued_entries)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get queue statistics"""
         stats = {
-            "queue_size": len(self._queue),
+            "queue_size": len(self._queued_entries),
             "total_jobs": len(self._jobs),
             "max_workers": self.max_workers,
             "running": self._running,
-            "status_counts": {}
+            "status_counts": dict(self._status_counts)
         }
         
-        # Count jobs by status
-        for status in JobStatus:
-            count = sum(1 for job in self._jobs.values() if job.status == status)
-            stats["status_counts"][status.value] = count
-        
         return stats
     
     async def _worker(self, worker_name: str):
@@ -199,16 +229,22 @@ class ProcessingQueue:
         
         while self._running:
             try:
-                # Get next job from queue
-                job = await self._get_next_job()
-                if not job:
-                    # No jobs available, wait a bit
-                    await asyncio.sleep(1.0)
-                    continue
-                
-                # Acquire worker semaphore
-                async with self._worker_semaphore:
+                # Sleeps until add_job puts an entry
+                _, _, job_id = await self._queue.get()
+                try:
+                    job = self._jobs.get(job_id)
+                    # Skip jobs cancelled (or cleaned up) while they waited
+                    if job is None or job.status != JobStatus.QUEUED:
+                        continue
+                    
+                    self._release_entry(job_id)
+                    self._set_status(job, JobStatus.PROCESSING)
+                    job.started_at_ns = time.monotonic_ns()
+                    job.message = "Processing started"
+                    
                     await self._process_job(job, worker_name)
+                finally:
+                    self._queue.task_done()
                     
             except asyncio.CancelledError:
                 break
@@ -218,32 +254,13 @@ class ProcessingQueue:
         
         logger.info(f"Worker {worker_name} stopped")
     
-    async def _get_next_job(self) -> Optional[ProcessingJob]:
-        """Get the next job from the priority queue"""
-        async with self._queue_lock:
-            while self._queue:
-                job = heapq.heappop(self._queue)
-                
-                # Skip cancelled jobs
-                if job.status == JobStatus.CANCELLED:
-                    continue
-                
-                # Mark job as processing
-                job.status = JobStatus.PROCESSING
-                job.started_at = datetime.now()
-                job.message = "Processing started"
-                
-                return job
-        
-        return None
-    
     async def _process_job(self, job: ProcessingJob, worker_name: str):
         """Process a single job"""
         logger.info(f"Worker {worker_name} processing job {job.id}")
         
         try:
             # Import here to avoid circular imports
-            from main import jobs, process_conversion
+            from tasks import process_conversion
             
             # Check if job was cancelled
             if job.status == JobStatus.CANCELLED:
@@ -258,18 +275,17 @@ class ProcessingQueue:
     
     async def cleanup_old_jobs(self, max_age_hours: int = 24):
         """Clean up old completed/failed jobs"""
-        current_time = datetime.now()
+        cutoff_ns = time.monotonic_ns() - max_age_hours * 3600 * 1_000_000_000
         jobs_to_remove = []
         
         for job_id, job in self._jobs.items():
             if job.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED]:
-                if job.completed_at:
-                    age_hours = (current_time - job.completed_at).total_seconds() / 3600
-                    if age_hours > max_age_hours:
-                        jobs_to_remove.append(job_id)
+                if job.completed_at_ns is not None and job.completed_at_ns < cutoff_ns:
+                    jobs_to_remove.append(job_id)
         
         for job_id in jobs_to_remove:
-            del self._jobs[job_id]
+            job = self._jobs.pop(job_id)
+            self._status_counts[job.status.value] -= 1
             logger.info(f"Cleaned up old job {job_id}")
         
         if jobs_to_remove:
@@ -279,19 +295,22 @@ class ProcessingQueue:
         """Get status of all jobs in queue"""
         queue_status = []
         
-        # Add queued jobs
-        async with self._queue_lock:
-            for job in sorted(self._queue, key=lambda x: (x.priority.value, x.created_at)):
-                queue_status.append({
-                    "id": job.id,
-                    "status": job.status.value,
-                    "priority": job.priority.name,
-                    "progress": job.progress,
-                    "message": job.message,
-                    "created_at": job.created_at.isoformat(),
-                    "started_at": job.started_at.isoformat() if job.started_at else None,
-                    "completed_at": job.completed_at.isoformat() if job.completed_at else None
-                })
+        # Add queued jobs in submission order
+        for job_id in self._queued_entries:
+            job = self._jobs.get(job_id)
+            if job is None:
+                continue
+            
+            queue_status.append({
+                "id": job.id,
+                "status": job.status.value,
+                "priority": job.priority.name,
+                "progress": job.progress,
+                "message": job.message,
+                "created_at": _monotonic_isoformat(job.created_at_ns),
+                "started_at": _monotonic_isoformat(job.started_at_ns),
+                "completed_at": _monotonic_isoformat(job.completed_at_ns)
+            })
         
         return queue_status
     
@@ -301,14 +320,12 @@ class ProcessingQueue:
         if not job or job.status != JobStatus.QUEUED:
             return None
         
-        # Count jobs ahead in queue with higher or equal priority
+        # Count live jobs that will be popped before this one; entries are plain
+        # tuples, so this is a C-level compare per entry rather than __lt__ dispatch
         jobs_ahead = 0
-        async with self._queue_lock:
-            for queued_job in self._queue:
-                if queued_job.id == job_id:
-                    break
-                if queued_job.priority.value <= job.priority.value:
-                    jobs_ahead += 1
+        position = self._queued_entries.get(job_id)
+        if position is not None:
+            jobs_ahead = sum(1 for entry in self._queued_entries.values() if entry < position)
         
         # Estimate processing time per job (in seconds)
         avg_processing_time = 60.0  # 1 minute average
@@ -4,35 +4,92 @@ Handles Redis connections, caching, and distributed task management
 """
 
 import redis
+import redis.asyncio as aioredis
 import json
+import os
 import pickle
 import logging
 import asyncio
+import time
+import uuid
 from typing import Optional, Dict, Any, List
-import aioredis
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+# Upper bound on async connections shared by every coroutine in this process
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "64"))
+
+# Sliding-window admission: trim, count and conditionally admit in one round trip.
+# Backs both the rate limiter and the concurrent job slots.
+# KEYS[1] = window key, ARGV = now_ms, window_ms, limit, member
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+if redis.call('ZCARD', key) < tonumber(ARGV[3]) then
+    redis.call('ZADD', key, now, ARGV[4])
+    redis.call('PEXPIRE', key, window)
+    return 1
+end
+return 0
+"""
+
+# Cancel unless the job already finished; compare-and-set on the job hash.
+# KEYS[1] = job hash, KEYS[2] = job queue, ARGV = job_id, message, completed_at
+# Returns -1 if the job does not exist, 0 if it already finished, 1 if cancelled
+CANCEL_JOB_LUA = """
+local status = redis.call('HGET', KEYS[1], 'status')
+if not status then
+    return -1
+end
+if status == 'completed' or status == 'failed' then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'status', 'cancelled', 'message', ARGV[2], 'completed_at', ARGV[3])
+redis.call('ZREM', KEYS[2], ARGV[1])
+return 1
+"""
+
 class RedisManager:
     """Manages Redis connections and operations for distributed processing"""
     
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
+    def __init__(self, redis_url: str = REDIS_URL):
         self.redis_url = redis_url
         self.redis_client = None
-        self.async_redis = None
+        self.client = None
+        self.pool = None
+        self._owns_pool = False
         self.connection_pool = None
+        self._sliding_window_script = None
+        self._cancel_job_script = None
+        
+    @staticmethod
+    def create_pool(redis_url: str = REDIS_URL, max_connections: int = REDIS_MAX_CONNECTIONS) -> aioredis.ConnectionPool:
+        """Create a bounded async connection pool"""
+        return aioredis.ConnectionPool.from_url(
+            redis_url,
+            max_connections=max_connections,
+            decode_responses=True
+        )
+    
+    async def initialize(self, pool: Optional[aioredis.ConnectionPool] = None):
+        """Initialize Redis connections
         
-    async def initialize(self):
-        """Initialize Redis connections"""
+        Args:
+            pool: Shared async connection pool; one is created from redis_url if omitted
+        """
         try:
-            # Async Redis connection for real-time operations
-            self.async_redis = await aioredis.from_url(
-                self.redis_url,
-                encoding="utf-8",
-                decode_responses=True,
-                max_connections=20
-            )
+            # Single async client multiplexed over a bounded connection pool
+            self._owns_pool = pool is None
+            self.pool = pool or self.create_pool(self.redis_url)
+            self.client = aioredis.Redis(connection_pool=self.pool)
+            
+            # Server-side scripts (EVALSHA, reloaded automatically on NOSCRIPT)
+            self._sliding_window_script = self.client.register_script(SLIDING_WINDOW_LUA)
+            self._cancel_job_script = self.client.register_script(CANCEL_JOB_LUA)
             
             # Sync Redis connection for background tasks
             self.connection_pool = redis.ConnectionPool.from_url(
@@ -49,7 +106,7 @@ class RedisManager:
             )
             
             # Test connections
-            await self.async_redis.ping()
+            await self.client.ping()
             self.redis_client.ping()
             
             logger.info("Redis connections initialized successfully")
@@ -61,8 +118,10 @@ class RedisManager:
     async def cleanup(self):
         """Cleanup Redis connections"""
         try:
-            if self.async_redis:
-                await self.async_redis.close()
+            if self.client:
+                await self.client.close()
+            if self.pool and self._owns_pool:
+                await self.pool.disconnect()
             if self.connection_pool:
                 self.connection_pool.disconnect()
             logger.info("Redis connections closed")
@@ -70,24 +129,36 @@ class RedisManager:
             logger.error(f"Error closing Redis connections: {e}")
     
     # Job Management
-    async def add_job(self, job_id: str, job_data: Dict[str, Any], priority: int = 1):
-        """Add job to processing queue with priority"""
+    async def add_job(self, job_id: str, job_data: Dict[str, Any], priority: int = 1,
+                      session_id: Optional[str] = None, message: str = ""):
+        """Add job to processing queue with priority, and to the owning session if given"""
         try:
+            # Batch all writes into a single round trip
+            pipe = self.client.pipeline(transaction=False)
+            
             # Store job data
-            await self.async_redis.hset(f"job:{job_id}", mapping={
+            pipe.hset(f"job:{job_id}", mapping={
                 "id": job_id,
                 "data": json.dumps(job_data),
                 "status": "queued",
+                "progress": 0.0,
+                "message": message,
                 "created_at": datetime.now().isoformat(),
                 "priority": priority,
-                "attempts": 0
+                "attempts": 0,
+                "user_key": job_data.get("user_key") or ""
             })
             
             # Add to priority queue
-            await self.async_redis.zadd("job_queue", {job_id: priority})
+            pipe.zadd("job_queue", {job_id: priority})
             
             # Set TTL for job data (24 hours)
-            await self.async_redis.expire(f"job:{job_id}", 86400)
+            pipe.expire(f"job:{job_id}", 86400)
+            
+            if session_id:
+                self._queue_session_job(pipe, session_id, job_id)
+            
+            await pipe.execute()
             
             logger.info(f"Job {job_id} added to queue with priority {priority}")
             
@@ -99,7 +170,7 @@ class RedisManager:
         """Get next job from priority queue"""
         try:
             # Get highest priority job (lowest score)
-            result = await self.async_redis.zpopmin("job_queue", 1)
+            result = await self.client.zpopmin("job_queue", 1)
             
             if not result:
                 return None
@@ -107,14 +178,14 @@ class RedisManager:
             job_id, priority = result[0]
             
             # Get job data
-            job_data = await self.async_redis.hgetall(f"job:{job_id}")
+            job_data = await self.client.hgetall(f"job:{job_id}")
             
             if not job_data:
                 return None
             
             # Mark as processing
-            await self.async_redis.hset(f"job:{job_id}", "status", "processing")
-            await self.async_redis.hset(f"job:{job_id}", "started_at", datetime.now().isoformat())
+            await self.client.hset(f"job:{job_id}", "status", "processing")
+            await self.client.hset(f"job:{job_id}", "started_at", datetime.now().isoformat())
             
             return {
                 "id": job_id,
@@ -126,10 +197,17 @@ class RedisManager:
             logger.error(f"Error getting next job: {e}")
             return None
     
-    async def update_job_status(self, job_id: str, status: str, progress: float = None, message: str = None):
-        """Update job status and progress"""
+    async def update_job_status(self, job_id: str, status: str, progress: float = None, message: str = None,
+                                result_url: str = None, error: str = None):
+        """Update job status and progress
+        
+        Redis is the single source of truth for job state; the hash write and the
+        pub/sub notification go out in one round trip.
+        """
         try:
-            updates = {"status": status}
+            now = datetime.now().isoformat()
+            updates = {"status": status, "updated_at": now}
+            finished = status in ["completed", "failed", "cancelled"]
             
             if progress is not None:
                 updates["progress"] = str(progress)
@@ -137,30 +215,52 @@ class RedisManager:
             if message:
                 updates["message"] = message
             
-            if status in ["completed", "failed", "cancelled"]:
-                updates["completed_at"] = datetime.now().isoformat()
+            if result_url:
+                updates["result_url"] = result_url
+            
+            if error:
+                updates["error"] = error
             
-            await self.async_redis.hset(f"job:{job_id}", mapping=updates)
+            if finished:
+                updates["completed_at"] = now
+            
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hset(f"job:{job_id}", mapping=updates)
+            
+            # Job has left the waiting queue
+            if status != "queued":
+                pipe.zrem("job_queue", job_id)
             
             # Publish status update for real-time notifications
-            await self.async_redis.publish(
+            pipe.publish(
                 f"job_status:{job_id}",
                 json.dumps({
                     "job_id": job_id,
                     "status": status,
                     "progress": progress,
                     "message": message,
-                    "timestamp": datetime.now().isoformat()
+                    "result_url": result_url,
+                    "error": error,
+                    "timestamp": now
                 })
             )
             
+            if finished:
+                pipe.hget(f"job:{job_id}", "user_key")
+            
+            results = await pipe.execute()
+            
+            # Free the owner's concurrent slot once the job is done
+            if finished and results[-1]:
+                await self.release_concurrent_slot(results[-1], job_id)
+            
         except Exception as e:
             logger.error(f"Error updating job {job_id}: {e}")
     
     async def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get job status and details"""
         try:
-            job_data = await self.async_redis.hgetall(f"job:{job_id}")
+            job_data = await self.client.hgetall(f"job:{job_id}")
             
             if not job_data:
                 return None
@@ -178,20 +278,49 @@ class RedisManager:
             logger.error(f"Error getting job status {job_id}: {e}")
             return None
     
+    async def cancel_job(self, job_id: str, message: str) -> Optional[bool]:
+        """Atomically cancel a job that has not finished yet
+        
+        Returns:
+            True if cancelled, False if already completed/failed, None if not found
+        """
+        now = datetime.now().isoformat()
+        result = await self._cancel_job_script(
+            keys=[f"job:{job_id}", "job_queue"],
+            args=[job_id, message, now]
+        )
+        
+        if result == -1:
+            return None
+        
+        if result == 1:
+            user_key = await self.client.hget(f"job:{job_id}", "user_key")
+            if user_key:
+                await self.release_concurrent_slot(user_key, job_id)
+            
+            await self.client.publish(f"job_status:{job_id}", json.dumps({
+                "job_id": job_id,
+                "status": "cancelled",
+                "message": message,
+                "timestamp": now
+            }))
+        
+        return result == 1
+    
     # Session Management
     async def create_session(self, session_id: str, user_data: Dict[str, Any]):
         """Create user session"""
         try:
+            now = datetime.now().isoformat()
             session_data = {
                 "id": session_id,
-                "created_at": datetime.now().isoformat(),
-                "last_activity": datetime.now().isoformat(),
-                "jobs": json.dumps([]),
+                "created_at": now,
+                "last_activity": now,
                 **user_data
             }
             
-            await self.async_redis.hset(f"session:{session_id}", mapping=session_data)
-            await self.async_redis.expire(f"session:{session_id}", 3600)  # 1 hour TTL
+            await self.client.hset(f"session:{session_id}", mapping=session_data)
+            await self.client.expire(f"session:{session_id}", 3600)  # 1 hour TTL
             
         except Exception as e:
             logger.error(f"Error creating session {session_id}: {e}")
@@ -199,21 +328,16 @@ class RedisManager:
     async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get session data"""
         try:
-            session_data = await self.async_redis.hgetall(f"session:{session_id}")
+            session_data = await self.client.hgetall(f"session:{session_id}")
             
             if not session_data:
                 return None
             
             # Update last activity
-            await self.async_redis.hset(f"session:{session_id}", "last_activity", datetime.now().isoformat())
-            await self.async_redis.expire(f"session:{session_id}", 3600)
+            await self.client.hset(f"session:{session_id}", "last_activity", datetime.now().isoformat())
+            await self.client.expire(f"session:{session_id}", 3600)
             
-            # Parse jobs list
-            if "jobs" in session_data:
-                try:
-                    session_data["jobs"] = json.loads(session_data["jobs"])
-                except:
-                    session_data["jobs"] = []
+            session_data["jobs"] = await self.client.lrange(f"session_jobs:{session_id}", 0, -1)
             
             return session_data
             
@@ -221,19 +345,21 @@ class RedisManager:
             logger.error(f"Error getting session {session_id}: {e}")
             return None
     
+    @staticmethod
+    def _queue_session_job(pipe, session_id: str, job_id: str):
+        """Queue the commands that append a job ID to a session's job list"""
+        key = f"session_jobs:{session_id}"
+        pipe.rpush(key, job_id)
+        # Keep only last 10 jobs per session
+        pipe.ltrim(key, -10, -1)
+        pipe.expire(key, 3600)
+    
     async def add_job_to_session(self, session_id: str, job_id: str):
         """Add job ID to user session"""
         try:
-            session_data = await self.get_session(session_id)
-            
-            if session_data:
-                jobs = session_data.get("jobs", [])
-                if job_id not in jobs:
-                    jobs.append(job_id)
-                    # Keep only last 10 jobs per session
-                    jobs = jobs[-10:]
-                    
-                await self.async_redis.hset(f"session:{session_id}", "jobs", json.dumps(jobs))
+            pipe = self.client.pipeline(transaction=False)
+            self._queue_session_job(pipe, session_id, job_id)
+            await pipe.execute()
             
         except Exception as e:
             logger.error(f"Error adding job to session {session_id}: {e}")
@@ -247,7 +373,7 @@ class RedisManager:
             elif not isinstance(value, (str, bytes, int, float)):
                 value = pickle.dumps(value)
                 
-            await self.async_redis.setex(key, ttl, value)
+            await self.client.setex(key, ttl, value)
             
         except Exception as e:
             logger.error(f"Error setting cache {key}: {e}")
@@ -255,7 +381,7 @@ class RedisManager:
     async def cache_get(self, key: str) -> Any:
         """Get cache value"""
         try:
-            value = await self.async_redis.get(key)
+            value = await self.client.get(key)
             
             if value is None:
                 return None
@@ -277,7 +403,7 @@ class RedisManager:
     async def cache_delete(self, key: str):
         """Delete cache key"""
         try:
-            await self.async_redis.delete(key)
+            await self.client.delete(key)
         except Exception as e:
             logger.error(f"Error deleting cache {key}: {e}")
     
@@ -288,25 +414,25 @@ class RedisManager:
             stats = {}
             
             # Queue statistics
-            stats["queue_size"] = await self.async_redis.zcard("job_queue")
+            stats["queue_size"] = await self.client.zcard("job_queue")
             
             # Job status counts
-            job_keys = await self.async_redis.keys("job:*")
+            job_keys = await self.client.keys("job:*")
             status_counts = {"queued": 0, "processing": 0, "completed": 0, "failed": 0}
             
             for job_key in job_keys[:1000]:  # Limit to avoid performance issues
-                status = await self.async_redis.hget(job_key, "status")
+                status = await self.client.hget(job_key, "status")
                 if status in status_counts:
                     status_counts[status] += 1
             
             stats["job_status"] = status_counts
             
             # Active sessions
-            session_keys = await self.async_redis.keys("session:*")
+            session_keys = await self.client.keys("session:*")
             stats["active_sessions"] = len(session_keys)
             
             # Memory usage
-            memory_info = await self.async_redis.info("memory")
+            memory_info = await self.client.info("memory")
             stats["memory_usage"] = {
                 "used_memory": memory_info.get("used_memory", 0),
                 "used_memory_human": memory_info.get("used_memory_human", "0B"),
@@ -321,27 +447,52 @@ class RedisManager:
     
     # Rate Limiting
     async def check_rate_limit(self, identifier: str, limit: int, window: int) -> bool:
-        """Check if request is within rate limit"""
+        """Check if request is within rate limit (sliding window of `window` seconds)"""
         try:
-            key = f"rate_limit:{identifier}"
-            current = await self.async_redis.get(key)
-            
-            if current is None:
-                await self.async_redis.setex(key, window, 1)
-                return True
-            
-            current_count = int(current)
-            
-            if current_count >= limit:
-                return False
+            key = f"rate_window:{identifier}"
+            now_ms = int(time.time() * 1000)
             
-            await self.async_redis.incr(key)
-            return True
+            allowed = await self._sliding_window_script(
+                keys=[key],
+                args=[now_ms, window * 1000, limit, uuid.uuid4().hex]
+            )
+            return allowed == 1
             
         except Exception as e:
             logger.error(f"Error checking rate limit for {identifier}: {e}")
             return True  # Allow on error
     
+    # Concurrent Job Slots
+    async def acquire_concurrent_slot(self, user_key: str, limit: int, req_id: str, ttl: int = 3600) -> bool:
+        """Reserve one of a user's in-flight job slots
+        
+        Args:
+            user_key: Session ID or client IP owning the job
+            limit: Maximum in-flight jobs for this user
+            req_id: Job ID occupying the slot
+            ttl: Seconds after which a slot is treated as stale (e.g. worker crashed)
+            
+        Returns:
+            True if the slot was acquired
+        """
+        try:
+            allowed = await self._sliding_window_script(
+                keys=[f"concurrent:{user_key}"],
+                args=[int(time.time() * 1000), ttl * 1000, limit, req_id]
+            )
+            return allowed == 1
+            
+        except Exception as e:
+            logger.error(f"Error acquiring concurrent slot for {user_key}: {e}")
+            return True  # Allow on error
+    
+    async def release_concurrent_slot(self, user_key: str, req_id: str):
+        """Release a user's in-flight job slot"""
+        try:
+            await self.client.zrem(f"concurrent:{user_key}", req_id)
+        except Exception as e:
+            logger.error(f"Error releasing concurrent slot for {user_key}: {e}")
+    
     # Distributed Lock
     async def acquire_lock(self, lock_name: str, timeout: int = 10) -> bool:
         """Acquire distributed lock"""
@@ -349,7 +500,7 @@ class RedisManager:
             lock_key = f"lock:{lock_name}"
             identifier = f"{datetime.now().timestamp()}"
             
-            result = await self.async_redis.set(
+            result = await self.client.set(
                 lock_key, 
                 identifier, 
                 nx=True, 
@@ -366,9 +517,9 @@ class RedisManager:
         """Release distributed lock"""
         try:
             lock_key = f"lock:{lock_name}"
-            await self.async_redis.delete(lock_key)
+            await self.client.delete(lock_key)
         except Exception as e:
             logger.error(f"Error releasing lock {lock_name}: {e}")
 
 # Global Redis manager instance
-redis_manager = RedisManager()
\ No newline at end of file
+redis_manager = RedisManager(REDIS_URL)
\ No newline at end of file
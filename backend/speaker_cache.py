@@ -0,0 +1,99 @@
+"""
+Speaker Embedding Cache Module
+Caches speaker embeddings by audio content hash in memory and on disk
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class SpeakerEmbeddingCache:
+    """LRU cache of speaker embeddings keyed by a hash of the decoded PCM samples"""
+
+    def __init__(self, cache_dir: str = "models/speaker_cache", maxsize: int = 256, max_disk_entries: int = 4096):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.maxsize = maxsize
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        # Lookups run on the event loop while puts run in worker threads
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(audio: np.ndarray) -> str:
+        """Hash decoded audio samples into a cache key"""
+        return hashlib.blake2b(np.ascontiguousarray(audio).tobytes(), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.npy"
+
+    def _remember(self, key: str, embedding: np.ndarray):
+        """Insert into the in-memory LRU, evicting the oldest entry if full"""
+        with self._lock:
+            self._memory[key] = embedding
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Get a cached embedding, falling back to the on-disk copy"""
+        with self._lock:
+            embedding = self._memory.get(key)
+            if embedding is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return embedding
+
+        path = self._path(key)
+        if path.exists():
+            try:
+                embedding = np.load(path, mmap_mode='r')
+                os.utime(path)  # Mark as recently used for eviction
+                self._remember(key, embedding)
+                self.hits += 1
+                return embedding
+            except Exception as e:
+                logger.warning(f"Failed to load cached speaker embedding {key}: {e}")
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, embedding: np.ndarray):
+        """Store an embedding in memory and on disk"""
+        self._remember(key, embedding)
+
+        try:
+            # Write to a temp file and rename so readers never see a partial file
+            path = self._path(key)
+            tmp_path = path.with_suffix(".tmp.npy")
+            np.save(tmp_path, embedding)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to persist speaker embedding {key}: {e}")
+
+    def evict_disk(self):
+        """Remove least recently used on-disk embeddings beyond max_disk_entries"""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".npy"):
+                    entries.append((entry.stat().st_mtime, entry.path))
+
+        for _, path in sorted(entries)[:max(0, len(entries) - self.max_disk_entries)]:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Failed to evict speaker embedding {path}: {e}")
+
+# Global speaker embedding cache instance
+speaker_cache = SpeakerEmbeddingCache()
@@ -0,0 +1,188 @@
+"""
+Background Tasks Module
+ARQ task definitions for voice conversion and cloning jobs
+
+Run the consumer alongside the API with: arq tasks.WorkerSettings
+"""
+
+import os
+import logging
+from typing import Optional, Dict, Any
+
+from arq.connections import RedisSettings
+
+from model_manager import ModelManager
+from redis_manager import redis_manager, REDIS_URL
+from worker_manager import worker_manager, process_audio_file
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_DIR = "outputs"
+
+# Model manager owned by the task worker process
+model_manager = ModelManager()
+
+async def update_job_status(
+    job_id: str,
+    status: str,
+    progress: float,
+    message: str,
+    result_url: Optional[str] = None,
+    error: Optional[str] = None
+):
+    """Update job status in Redis; API processes relay it to WebSockets via pub/sub"""
+    try:
+        await redis_manager.update_job_status(job_id, status, progress, message, result_url=result_url, error=error)
+        
+    except Exception as e:
+        logger.error(f"Error updating job status for {job_id}: {e}")
+
+async def _load_job_data(job_id: str, job_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Get job parameters, falling back to the data stored with the Redis job"""
+    job = await redis_manager.get_job_status(job_id)
+    if not job:
+        logger.error(f"Job {job_id} not found")
+        return None
+    
+    if job.get("status") == "cancelled":
+        logger.info(f"Job {job_id} was cancelled before processing")
+        return None
+    
+    if job_data:
+        return job_data
+    
+    return job.get("data") if isinstance(job.get("data"), dict) else job
+
+async def process_voice_cloning(job_id: str, job_data: Optional[Dict[str, Any]] = None):
+    """Process a voice cloning job with worker management"""
+    try:
+        job = await _load_job_data(job_id, job_data)
+        if not job:
+            return
+        
+        logger.info(f"Starting voice cloning for job {job_id}")
+        
+        await update_job_status(job_id, "processing", 15.0, "Đang phân tích giọng nói tham khảo...")
+        
+        # Prepare processing parameters
+        processing_params = {
+            "type": "cloning",
+            "reference_path": job["reference_path"],
+            "similarity_threshold": job["similarity_threshold"],
+            "sample_rate": 22050
+        }
+        
+        await update_job_status(job_id, "processing", 70.0, "Đang áp dụng đặc trưng vào âm thanh đích...")
+        
+        # Process with worker manager
+        session_id = job.get("session_id") or "anonymous"
+        output_dir = os.path.join(OUTPUT_DIR, session_id)
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, f"cloned_{job_id}.wav")
+        
+        result = await worker_manager.submit_audio_task(
+            process_audio_file,
+            job["target_path"],
+            output_path,
+            processing_params
+        )
+        
+        if result["success"]:
+            await update_job_status(
+                job_id, "completed", 100.0, "Nhân bản giọng nói hoàn thành thành công",
+                result_url=f"/static/{session_id}/cloned_{job_id}.wav"
+            )
+            logger.info(f"Voice cloning completed for job {job_id}")
+        else:
+            await update_job_status(job_id, "failed", 0, f"Nhân bản giọng nói thất bại: {result['error']}", error=result['error'])
+            
+    except Exception as e:
+        logger.error(f"Voice cloning failed for job {job_id}: {e}")
+        await update_job_status(job_id, "failed", 0, f"Nhân bản giọng nói thất bại: {str(e)}", error=str(e))
+
+async def process_conversion(job_id: str, job_data: Optional[Dict[str, Any]] = None):
+    """Process a voice conversion job with worker management"""
+    try:
+        job = await _load_job_data(job_id, job_data)
+        if not job:
+            return
+        
+        logger.info(f"Starting conversion for job {job_id}")
+        
+        # Update status
+        await update_job_status(job_id, "processing", 10.0, "Đang khởi tạo quy trình chuyển đổi...")
+        
+        # Make sure the model file is present; the worker process loads it
+        model_path = await model_manager.ensure_model_available(job["model_id"])
+        await update_job_status(job_id, "processing", 25.0, "Mô hình giọng nói đã được tải")
+        
+        # Prepare processing parameters
+        processing_params = {
+            "type": "conversion",
+            "model_id": job["model_id"],
+            "model_path": model_path,
+            "target_speaker": job["target_speaker"],
+            "conversion_strength": job["conversion_strength"],
+            "preserve_pitch": job["preserve_pitch"],
+            "noise_reduction": job["noise_reduction"],
+            "sample_rate": 22050
+        }
+        
+        await update_job_status(job_id, "processing", 70.0, "Đang chuyển đổi đặc điểm giọng nói...")
+        
+        # Process with worker manager
+        session_id = job.get("session_id") or "anonymous"
+        output_dir = os.path.join(OUTPUT_DIR, session_id)
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, f"converted_{job_id}.wav")
+        
+        result = await worker_manager.submit_audio_task(
+            process_audio_file,
+            job["input_path"],
+            output_path,
+            processing_params
+        )
+        
+        if result["success"]:
+            await update_job_status(
+                job_id, "completed", 100.0, "Chuyển đổi hoàn thành thành công",
+                result_url=f"/static/{session_id}/converted_{job_id}.wav"
+            )
+            logger.info(f"Conversion completed for job {job_id}")
+        else:
+            await update_job_status(job_id, "failed", 0, f"Chuyển đổi thất bại: {result['error']}", error=result['error'])
+            
+    except Exception as e:
+        logger.error(f"Conversion failed for job {job_id}: {e}")
+        await update_job_status(job_id, "failed", 0, f"Chuyển đổi thất bại: {str(e)}", error=str(e))
+
+# ARQ task entry points
+async def convert(ctx: Dict[str, Any], job_id: str, job_data: Dict[str, Any]):
+    """ARQ task: voice conversion"""
+    await process_conversion(job_id, job_data)
+
+async def clone(ctx: Dict[str, Any], job_id: str, job_data: Dict[str, Any]):
+    """ARQ task: voice cloning"""
+    await process_voice_cloning(job_id, job_data)
+
+async def startup(ctx: Dict[str, Any]):
+    """Initialize shared managers in the task worker process"""
+    await redis_manager.initialize()
+    await worker_manager.start()
+    await model_manager.initialize()
+    logger.info("Task worker initialization complete")
+
+async def shutdown(ctx: Dict[str, Any]):
+    """Cleanup shared managers in the task worker process"""
+    await worker_manager.stop()
+    await model_manager.cleanup()
+    await redis_manager.cleanup()
+
+class WorkerSettings:
+    """ARQ worker configuration"""
+    functions = [convert, clone]
+    on_startup = startup
+    on_shutdown = shutdown
+    redis_settings = RedisSettings.from_dsn(REDIS_URL)
+    max_jobs = worker_manager.max_workers
+    job_timeout = 3600
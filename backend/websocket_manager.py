@@ -253,6 +253,35 @@ class ConnectionManager:
 # Global connection manager instance
 connection_manager = ConnectionManager()
 
+# Background task relaying job updates published by task workers
+async def job_update_listener():
+    """Forward Redis job status messages to this process's WebSocket subscribers"""
+    from redis_manager import redis_manager
+    
+    while True:
+        pubsub = redis_manager.client.pubsub()
+        try:
+            await pubsub.psubscribe("job_status:*")
+            
+            async for message in pubsub.listen():
+                if message["type"] != "pmessage":
+                    continue
+                
+                update = json.loads(message["data"])
+                job_id = update.pop("job_id", None)
+                update.pop("timestamp", None)
+                
+                if job_id:
+                    await connection_manager.notify_job_update(job_id, update)
+                    
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"Error in job update listener: {e}")
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.close()
+
 # Background task for system monitoring
 async def system_monitor_task():
     """Background task to send periodic system updates"""
@@ -40,6 +40,8 @@ class WorkerManager:
         self.worker_stats: Dict[str, WorkerStats] = {}
         self.is_running = False
         self.cleanup_task = None
+        self.queue_info_task = None
+        self._cached_queue_info: Dict[str, Any] = {}
         
     def _calculate_optimal_workers(self) -> int:
         """Calculate optimal number of workers based on system resources"""
@@ -56,6 +58,11 @@ class WorkerManager:
         logger.info(f"Calculated optimal workers: {optimal} (CPU: {cpu_count}, RAM: {memory_gb:.1f}GB)")
         return optimal
     
+    def _intra_op_threads_per_worker(self) -> int:
+        """Split the physical cores between pool processes for model inference"""
+        physical_cores = psutil.cpu_count(logical=False) or mp.cpu_count()
+        return max(1, physical_cores // self.max_workers)
+    
     async def start(self):
         """Start worker manager"""
         if self.is_running:
@@ -66,7 +73,9 @@ class WorkerManager:
         # Create process pool for CPU-intensive tasks
         self.process_executor = ProcessPoolExecutor(
             max_workers=self.max_workers,
-            mp_context=mp.get_context('spawn')
+            mp_context=mp.get_context('spawn'),
+            initializer=_init_worker_process,
+            initargs=(self._intra_op_threads_per_worker(),)
         )
         
         # Create thread pool for I/O operations
@@ -184,10 +193,10 @@ class WorkerManager:
             # Get completed jobs older than 1 hour
             cutoff_time = datetime.now() - timedelta(hours=1)
             
-            job_keys = await redis_manager.async_redis.keys("job:*")
+            job_keys = await redis_manager.client.keys("job:*")
             
             for job_key in job_keys:
-                job_data = await redis_manager.async_redis.hgetall(job_key)
+                job_data = await redis_manager.client.hgetall(job_key)
                 
                 if job_data.get("status") in ["completed", "failed", "cancelled"]:
                     completed_at = job_data.get("completed_at")
@@ -197,7 +206,7 @@ class WorkerManager:
                             completed_time = datetime.fromisoformat(completed_at)
                             
                             if completed_time < cutoff_time:
-                                await redis_manager.async_redis.delete(job_key)
+                                await redis_manager.client.delete(job_key)
                                 logger.info(f"Cleaned up old job: {job_key}")
                                 
                         except Exception:
@@ -242,20 +251,47 @@ class WorkerManager:
         # Restart with new worker count
         await self.start()
     
+    async def start_queue_monitor(self, interval: float = 1.0):
+        """Start refreshing the cached queue info in the background"""
+        if self.queue_info_task is None:
+            self.queue_info_task = asyncio.create_task(self._refresh_queue_info(interval))
+    
+    async def stop_queue_monitor(self):
+        """Stop the queue info refresh task"""
+        if self.queue_info_task:
+            self.queue_info_task.cancel()
+            self.queue_info_task = None
+    
+    async def _refresh_queue_info(self, interval: float):
+        """Periodically refresh the cached queue info"""
+        while True:
+            try:
+                self._cached_queue_info = await self.get_queue_info()
+                await asyncio.sleep(interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error refreshing queue info: {e}")
+                await asyncio.sleep(interval)
+    
+    def get_cached_queue_info(self) -> Dict[str, Any]:
+        """Get the last refreshed queue info without touching Redis"""
+        return self._cached_queue_info
+    
     async def get_queue_info(self) -> Dict[str, Any]:
         """Get detailed queue information"""
         try:
             from redis_manager import redis_manager
             
             # Queue size
-            queue_size = await redis_manager.async_redis.zcard("job_queue")
+            queue_size = await redis_manager.client.zcard("job_queue")
             
             # Processing jobs
-            job_keys = await redis_manager.async_redis.keys("job:*")
+            job_keys = await redis_manager.client.keys("job:*")
             processing_jobs = 0
             
             for job_key in job_keys:
-                status = await redis_manager.async_redis.hget(job_key, "status")
+                status = await redis_manager.client.hget(job_key, "status")
                 if status == "processing":
                     processing_jobs += 1
             
@@ -278,6 +314,46 @@ class WorkerManager:
 # Global worker manager instance
 worker_manager = WorkerManager()
 
+# Models loaded inside each worker process, kept warm across jobs
+_MODEL_CACHE: Dict[str, Any] = {}
+
+# Intra-op threads for this worker's inference sessions, set by the pool initializer
+_WORKER_INTRA_OP_THREADS: Optional[int] = None
+
+def _init_worker_process(intra_op_threads: int):
+    """Pool initializer: record this process's share of the CPU cores"""
+    global _WORKER_INTRA_OP_THREADS
+    _WORKER_INTRA_OP_THREADS = intra_op_threads
+
+def _get_worker_model(model_id: str, model_path: Optional[str]) -> Any:
+    """Load a model once per worker process, or None if it cannot be loaded"""
+    model = _MODEL_CACHE.get(model_id)
+    if model is not None:
+        return model
+    
+    import model_manager
+    
+    if model_manager.ort is not None:
+        # Same tuned session as ModelManager, but limited to this process's cores
+        try:
+            model = model_manager._create_onnx_session(model_path, _WORKER_INTRA_OP_THREADS)
+        except Exception as e:
+            # A model ORT cannot parse must not fail the job; retry on the next one
+            logger.error(f"Failed to load model {model_id} in worker process {os.getpid()}: {e}")
+            return None
+    else:
+        # onnxruntime is optional; keep the same placeholder ModelManager uses
+        model = {
+            "id": model_id,
+            "path": model_path,
+            "loaded": True,
+            "providers": ["CPUExecutionProvider"]
+        }
+    
+    _MODEL_CACHE[model_id] = model
+    logger.info(f"Model {model_id} loaded in worker process {os.getpid()}")
+    return model
+
 # Utility functions for worker processes
 def process_audio_file(input_path: str, output_path: str, processing_params: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -306,7 +382,10 @@ def process_audio_file(input_path: str, output_path: str, processing_params: Dic
         
         if processing_type == "conversion":
             # Voice conversion processing
-            processed_audio = _process_voice_conversion(audio, processing_params)
+            model = None
+            if processing_params.get("model_path"):
+                model = _get_worker_model(processing_params["model_id"], processing_params["model_path"])
+            processed_audio = _process_voice_conversion(audio, processing_params, model)
         elif processing_type == "cloning":
             # Voice cloning processing
             reference_path = processing_params.get("reference_path")
@@ -340,10 +419,13 @@ def process_audio_file(input_path: str, output_path: str, processing_params: Dic
             "error": str(e)
         }
 
-def _process_voice_conversion(audio: "np.ndarray", params: Dict[str, Any]) -> "np.ndarray":
+def _process_voice_conversion(audio: "np.ndarray", params: Dict[str, Any], model: Any = None) -> "np.ndarray":
     """Process voice conversion (simplified for CPU)"""
     import numpy as np
     
+    # model is this worker's warm session for params["model_id"] (None if unavailable);
+    # the simulation below does not run inference yet and works without it
+    
     # Basic voice conversion simulation
     processed = audio.copy()
     
@@ -414,21 +496,26 @@ def _apply_pitch_shift(audio: "np.ndarray", shift_factor: float) -> "np.ndarray"
 def _match_spectral_characteristics(target: "np.ndarray", reference: "np.ndarray", strength: float) -> "np.ndarray":
     """Match spectral characteristics between audio signals"""
     import numpy as np
+    import scipy.fft as sfft
     
-    # Simple frequency domain matching
-    target_fft = np.fft.fft(target)
-    ref_fft = np.fft.fft(reference[:len(target)])
+    # Simple frequency domain matching on the one-sided spectrum of the real
+    # signals (a shorter reference is zero-padded to the target length)
+    n = len(target)
+    target_fft = sfft.rfft(target, workers=-1)
+    ref_fft = sfft.rfft(reference[:n], n=n, workers=-1)
     
     # Match magnitude spectrum
     target_mag = np.abs(target_fft)
     ref_mag = np.abs(ref_fft)
-    target_phase = np.angle(target_fft)
     
     # Blend magnitudes
     blended_mag = ref_mag * strength + target_mag * (1 - strength)
     
-    # Reconstruct signal
-    blended_fft = blended_mag * np.exp(1j * target_phase)
-    result = np.real(np.fft.ifft(blended_fft))
+    # Reconstruct signal, keeping the target phase by rescaling its bins
+    # (target_fft / |target_fft| == exp(1j * angle(target_fft)), no trig needed)
+    np.maximum(target_mag, 1e-8, out=target_mag)
+    np.divide(blended_mag, target_mag, out=blended_mag)
+    np.multiply(target_fft, blended_mag, out=target_fft)
+    result = sfft.irfft(target_fft, n=n, workers=-1)
     
     return result.astype(np.float32)
\ No newline at end of file